@@ -1,16 +1,67 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from backend.database import get_db, User
 from backend.schemas import UserOut
-from backend.auth import get_current_user
+from backend.auth import require_admin, invalidate_principal
+from backend.pagination import encode_cursor, decode_id_cursor, export_response, NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+USER_COLUMNS = ["id", "username", "email", "is_active"]
+
 @router.get("/users", response_model=list[UserOut])
 async def get_all_users(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_admin)
+):
+    """id 순 keyset 페이지네이션. 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 전달"""
+    stmt = select(User).order_by(User.id).limit(limit + 1)
+    if cursor:
+        stmt = stmt.where(User.id > decode_id_cursor(cursor))
+    result = await db.execute(stmt)
+    users = result.scalars().all()
+    if len(users) > limit:
+        users = users[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(users[-1].id)
+    return users
+
+@router.get("/users/export", summary="사용자 목록 export (ndjson/csv 스트리밍)")
+async def export_users(
+    format: str = Query("ndjson", description="ndjson | csv"),
+    current_user=Depends(require_admin)
+):
+    stmt = select(*[getattr(User, c) for c in USER_COLUMNS]).order_by(User.id)
+    return export_response(stmt, USER_COLUMNS, format, "users")
+
+async def set_user_active(db: AsyncSession, user_id: int, active: bool) -> User:
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.is_active = active
+    # 기존 토큰 무효화 + 캐시된 principal 제거 → 다른 워커/Redis에 남은 항목도 버전 불일치로 거부됨
+    user.token_version = (user.token_version or 0) + 1
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.username)
+    return user
+
+@router.post("/users/{user_id}/deactivate", response_model=UserOut, summary="사용자 비활성화 (기존 토큰 즉시 무효화)")
+async def deactivate_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_admin)
+):
+    return await set_user_active(db, user_id, False)
+
+@router.post("/users/{user_id}/activate", response_model=UserOut, summary="사용자 재활성화")
+async def activate_user(
+    user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(require_admin)
 ):
-    result = await db.execute(select(User))
-    return result.scalars().all()
+    return await set_user_active(db, user_id, True)
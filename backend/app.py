@@ -1,22 +1,64 @@
-from fastapi import FastAPI
-from backend.user import router as user_router
-from backend.spending import router as spending_router
-from backend.forecast import router as forecast_router
-from backend.policy import router as policy_router
-from backend.admin import router as admin_router
-from backend.bank import router as bank_router
-from backend.auth import router as auth_router
+import importlib
+import logging
+import time
+from fastapi import Depends, FastAPI, Request
+from backend import metrics, subsystems
+from backend.db_instrumentation import start_request_stats, end_request_stats
+from backend.logging_module import log_event
+from backend.config import ENABLED_ROUTERS, WARMUP_SUBSYSTEMS
+from backend.metrics import router as metrics_router
+from backend.auth import require_admin
 
+# 라우터 이름 → 모듈. 비활성화된 라우터는 import 자체를 하지 않으므로
+# policy(KoBERT/faiss), forecast(pandas/prophet) 의존성도 로드되지 않는다.
+ROUTER_MODULES = {
+    "auth": "backend.auth",
+    "users": "backend.user",
+    "spending": "backend.spending",
+    "forecast": "backend.forecast",
+    "policy": "backend.policy",
+    "admin": "backend.admin",
+    "bank": "backend.bank",
+}
+
+enabled_routers = [name for name in ROUTER_MODULES if not ENABLED_ROUTERS or name in ENABLED_ROUTERS]
 
 app = FastAPI()
-app.include_router(auth_router)
-app.include_router(user_router)
-app.include_router(spending_router)
-app.include_router(forecast_router)
-app.include_router(policy_router)
-app.include_router(admin_router)
-app.include_router(bank_router)
+for name in enabled_routers:
+    app.include_router(importlib.import_module(ROUTER_MODULES[name]).router)
+# 풀 포화도/엔드포인트별 시간/캐시·DB 통계는 내부 정보이므로 관리자만
+app.include_router(metrics_router, dependencies=[Depends(require_admin)])
+
+@app.middleware("http")
+async def db_request_stats(request: Request, call_next):
+    """요청별 쿼리 수/DB 시간을 집계해 metrics와 응답 헤더로 내보낸다"""
+    token = start_request_stats()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        stats = end_request_stats(token)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    metrics.observe("db.request_queries", stats["queries"])
+    metrics.observe("db.request_ms", stats["db_ms"])
+    response.headers["X-DB-Queries"] = str(stats["queries"])
+    response.headers["X-DB-Time-Ms"] = f"{stats['db_ms']:.1f}"
+    log_event(
+        "request", level=logging.DEBUG, method=request.method, path=request.url.path,
+        status=response.status_code, duration_ms=round(elapsed_ms, 1),
+        db_queries=stats["queries"], db_ms=round(stats["db_ms"], 1),
+    )
+    return response
+
+@app.on_event("startup")
+async def warm_up_subsystems():
+    subsystems.warm_up(WARMUP_SUBSYSTEMS)
 
 @app.get("/")
 async def root():
     return {"msg": "NextStep API is running!"}
+
+@app.get("/ready")
+async def ready():
+    """요청 처리 가능 여부와 서브시스템 로딩 상태"""
+    return {"status": "ok", "routers": enabled_routers, "subsystems": subsystems.status()}
@@ -1,3 +1,4 @@
+import time
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
@@ -6,15 +7,50 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from backend.database import get_db, User
-from backend.schemas import Token
-from backend.config import SECRET_KEY, ALGORITHM
+from backend.schemas import Token, Principal
+from backend.cache import make_cache, RedisInvalidator
+from backend.logging_module import logger
+from backend.password_hasher import PasswordHasher, HashQueueTimeout
+from backend.config import (
+    SECRET_KEY, ALGORITHM, CACHE_REDIS_URL,
+    PRINCIPAL_CACHE_BACKEND, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, PRINCIPAL_INVALIDATION_PUBSUB,
+    BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_TIMEOUT, PASSWORD_HASH_RETRY_AFTER,
+)
 
 # ────────────── 보안/암호화 설정 ──────────────
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max를 기본값과 같게 두면 cost가 다른 기존 해시는 needs_update → 로그인 시 재해시
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS, bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_TIMEOUT)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 router = APIRouter()
 
+# 토큰 subject(username) → Principal. 사용자 변경/비활성화 시 invalidate_principal()로 제거
+principal_cache = make_cache(
+    "principal", PRINCIPAL_CACHE_BACKEND, PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, redis_url=CACHE_REDIS_URL
+)
+# memory 백엔드는 워커마다 캐시가 따로 있으므로 삭제를 pub/sub으로 다른 워커에도 전파.
+# 전파가 안 되는 경우(Redis 장애, PUBSUB 꺼짐) 다른 워커에서는 최대 PRINCIPAL_CACHE_TTL 동안 이전 상태가 보일 수 있다.
+principal_invalidator = None
+if PRINCIPAL_CACHE_BACKEND != "redis" and PRINCIPAL_INVALIDATION_PUBSUB:
+    try:
+        principal_invalidator = RedisInvalidator(principal_cache, CACHE_REDIS_URL, "nextstep:invalidate:principal")
+    except Exception as e:
+        logger.warning(f"principal 캐시 무효화 전파 비활성화: {e}")
+
+@router.on_event("startup")
+def start_principal_invalidator():
+    if principal_invalidator is not None:
+        principal_invalidator.start()
+
+@router.on_event("shutdown")
+def stop_principal_invalidator():
+    if principal_invalidator is not None:
+        principal_invalidator.stop()
+
 # ────────────── 패스워드 해시/검증 ──────────────
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,6 +58,31 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# async 핸들러에서는 아래를 사용 (이벤트 루프 밖 전용 스레드에서 실행)
+def _busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="요청이 많습니다. 잠시 후 다시 시도해 주세요.",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
+
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.run(pwd_context.hash, password)
+    except HashQueueTimeout:
+        raise _busy_exception()
+
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    """(일치 여부, 새 해시 또는 None). cost 설정이 바뀐 해시면 새 해시를 함께 돌려준다"""
+    try:
+        return await password_hasher.run(pwd_context.verify_and_update, plain_password, hashed_password)
+    except HashQueueTimeout:
+        raise _busy_exception()
+
+@router.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
 # ────────────── JWT 토큰 발급 ──────────────
 def create_access_token(data: dict, expires_delta=None):
     from datetime import datetime, timedelta
@@ -39,20 +100,40 @@ async def login_for_access_token(
     # username 기준(변경 가능, email을 username 자리에 입력할 수도 있음)
     result = await db.execute(select(User).where(User.username == form_data.username))
     user = result.scalars().first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.username})
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    # ver: 사용자 token_version을 올리면 이전에 발급된 토큰은 모두 거부됨
+    access_token = create_access_token(data={"sub": user.username, "ver": user.token_version or 0})
     return {"access_token": access_token, "token_type": "bearer"}
 
 # ────────────── 인증된 유저 정보 가져오기 ──────────────
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
+def principal_key(username: str) -> str:
+    return f"principal:{username}"
+
+def invalidate_principal(username: str):
+    """사용자 정보 변경/비활성화 후 호출 → 다음 요청부터 DB에서 다시 읽음 (다른 워커에도 전파)"""
+    if principal_invalidator is not None:
+        principal_invalidator.publish(principal_key(username))
+    else:
+        principal_cache.delete(principal_key(username))
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-):
+) -> Principal:
+    """토큰 검증 후 principal 캐시에서 사용자 요약을 꺼낸다. 캐시 miss일 때만 DB 조회"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -65,8 +146,46 @@ async def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalars().first()
-    if user is None:
+    version = payload.get("ver", 0)
+
+    key = principal_key(username)
+    principal = principal_cache.get(key)
+    if principal is None or principal.token_version != version:
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+        principal = Principal(
+            id=user.id, username=user.username, email=user.email,
+            is_active=bool(user.is_active), token_version=user.token_version or 0,
+            is_admin=bool(user.is_admin),
+        )
+        # 토큰 만료 이후까지 캐시에 남지 않도록 TTL을 남은 유효기간으로 제한
+        remaining = payload["exp"] - time.time() if "exp" in payload else PRINCIPAL_CACHE_TTL
+        principal_cache.set(key, principal, ttl=max(1.0, min(PRINCIPAL_CACHE_TTL, remaining)))
+    if principal.token_version != version:
         raise credentials_exception
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return principal
+
+async def require_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """관리자 전용 라우트용"""
+    if not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return principal
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """ORM User 객체가 필요한 경우에만 사용 (기본 키 조회 1회)"""
+    user = await db.get(User, principal.id)
+    if user is None:
+        invalidate_principal(principal.username)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
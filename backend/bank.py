@@ -1,26 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
+import math
+from collections import defaultdict
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import insert, update, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from backend.database import get_db, BankAccount, Transaction
-from backend.schemas import BankAccountCreate, BankAccountOut, TransactionCreate, TransactionOut
-from backend.auth import get_current_user
+from backend.schemas import (
+    BankAccountCreate, BankAccountOut, TransactionCreate, TransactionOut,
+    TransactionBulkCreate, TransactionBulkResultItem, TransactionBulkOut,
+)
+from backend.auth import get_current_principal
+from backend.config import BANK_BULK_MAX_ROWS
+from backend.pagination import (
+    encode_cursor, decode_timestamp_cursor, export_response, make_naive, NEXT_CURSOR_HEADER,
+)
 from datetime import timezone
 
 router = APIRouter(prefix="/bank", tags=["bank"])
 
 from datetime import datetime
 
-def make_naive(dt: datetime) -> datetime:
-    """timezone-aware datetime을 naive(타임존 없는)로 변환"""
-    if dt is not None and dt.tzinfo is not None:
-        return dt.astimezone(tz=None).replace(tzinfo=None)
-    return dt
+async def apply_balance_deltas(db: AsyncSession, deltas: dict) -> set:
+    """계좌별 합계를 UPDATE ... SET balance = balance + :delta 로 반영 (동시 요청에도 갱신 유실 없음).
+
+    실제로 갱신된 계좌 id 집합을 반환. 커밋은 호출한 쪽 트랜잭션에서.
+    """
+    updated = set()
+    # 계좌 id 순서로 잠가서 같은 계좌들을 건드리는 동시 요청끼리 교착되지 않게
+    for account_id, delta in sorted(deltas.items()):
+        result = await db.execute(
+            update(BankAccount)
+            .where(BankAccount.id == account_id)
+            .values(balance=BankAccount.balance + delta)
+            .returning(BankAccount.id)
+        )
+        if result.scalar_one_or_none() is not None:
+            updated.add(account_id)
+    return updated
+
+async def ensure_account_owner(db: AsyncSession, bank_account_id: int, user_id: int):
+    """본인 계좌가 아니면 404 (다른 사용자 계좌 존재 여부도 드러내지 않음)"""
+    result = await db.execute(
+        select(BankAccount.id).where(BankAccount.id == bank_account_id, BankAccount.user_id == user_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Bank account not found")
 
 @router.post("/accounts/", response_model=BankAccountOut)
 async def create_account(
     account: BankAccountCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_principal)
 ):
     db_account = BankAccount(
         user_id=current_user.id,
@@ -35,7 +66,7 @@ async def create_account(
 @router.get("/accounts/", response_model=list[BankAccountOut])
 async def get_accounts(
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_principal)
 ):
     result = await db.execute(
         select(BankAccount).where(BankAccount.user_id == current_user.id)
@@ -46,7 +77,7 @@ async def get_accounts(
 async def create_transaction(
     tx: TransactionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_principal)
 ):
     # 1. timestamp가 tz-aware라면 naive로 변환
     timestamp = tx.timestamp
@@ -55,7 +86,14 @@ async def create_transaction(
     else:
         timestamp = datetime.utcnow()
 
-    # 2. 거래 생성
+    # 2. 본인 계좌만 허용 (아니면 404)
+    await ensure_account_owner(db, tx.bank_account_id, current_user.id)
+
+    # 3. 잔액 갱신 (원자적 UPDATE)
+    if not await apply_balance_deltas(db, {tx.bank_account_id: tx.amount}):
+        raise HTTPException(status_code=404, detail="Bank account not found")
+
+    # 4. 거래 생성
     db_tx = Transaction(
         bank_account_id=tx.bank_account_id,
         amount=tx.amount,
@@ -64,26 +102,100 @@ async def create_transaction(
     )
     db.add(db_tx)
 
-    # 3. 잔액 갱신
-    account = await db.get(BankAccount, tx.bank_account_id)
-    if account is not None:
-        account.balance += tx.amount
-    else:
-        raise HTTPException(status_code=404, detail="Bank account not found")
-
     await db.commit()
     await db.refresh(db_tx)
     return db_tx
 
+@router.post("/transactions/bulk", response_model=TransactionBulkOut, summary="거래 일괄 등록")
+async def create_transactions_bulk(
+    req: TransactionBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_principal)
+):
+    """행 단위로 검증 → 통과한 행만 multi-row INSERT 한 번 + 계좌별 잔액 UPDATE 한 번, 모두 한 트랜잭션.
+
+    실패한 행은 error에 사유를 담아 돌려주고 나머지는 그대로 등록한다.
+    """
+    if len(req.transactions) > BANK_BULK_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {BANK_BULK_MAX_ROWS}건까지 등록할 수 있습니다.")
 
+    # 본인 계좌만 허용
+    account_ids = {tx.bank_account_id for tx in req.transactions}
+    result = await db.execute(
+        select(BankAccount.id).where(BankAccount.id.in_(account_ids), BankAccount.user_id == current_user.id)
+    )
+    owned = set(result.scalars().all())
+
+    results = [TransactionBulkResultItem(index=i) for i in range(len(req.transactions))]
+    rows, row_index = [], []
+    deltas = defaultdict(float)
+    for i, tx in enumerate(req.transactions):
+        if tx.bank_account_id not in owned:
+            results[i].error = "Bank account not found"
+        elif not math.isfinite(tx.amount):
+            results[i].error = "amount must be a finite number"
+        else:
+            rows.append({
+                "bank_account_id": tx.bank_account_id,
+                "amount": tx.amount,
+                "description": tx.description,
+                "timestamp": make_naive(tx.timestamp) or datetime.utcnow(),
+            })
+            row_index.append(i)
+            deltas[tx.bank_account_id] += tx.amount
+
+    if rows:
+        result = await db.execute(
+            insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), rows
+        )
+        for i, tx_id in zip(row_index, result.scalars().all()):
+            results[i].id = tx_id
+        await apply_balance_deltas(db, deltas)
+        await db.commit()
+
+    return TransactionBulkOut(inserted=len(rows), failed=len(results) - len(rows), results=results)
+
+
+TRANSACTION_COLUMNS = ["id", "bank_account_id", "amount", "description", "timestamp"]
 
 @router.get("/transactions/", response_model=list[TransactionOut])
 async def get_transactions(
+    response: Response,
     bank_account_id: int,
+    limit: int = Query(100, ge=1, le=1000, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_principal)
 ):
-    result = await db.execute(
-        select(Transaction).where(Transaction.bank_account_id == bank_account_id)
+    """최신순 (timestamp, id) keyset 페이지네이션. 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 전달"""
+    await ensure_account_owner(db, bank_account_id, current_user.id)
+    stmt = (
+        select(Transaction)
+        .where(Transaction.bank_account_id == bank_account_id)
+        .order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+        .limit(limit + 1)
     )
-    return result.scalars().all()
+    if cursor:
+        timestamp, tx_id = decode_timestamp_cursor(cursor)
+        stmt = stmt.where(tuple_(Transaction.timestamp, Transaction.id) < tuple_(timestamp, tx_id))
+    result = await db.execute(stmt)
+    rows = result.scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return rows
+
+@router.get("/transactions/export", summary="거래내역 전체 export (ndjson/csv 스트리밍)")
+async def export_transactions(
+    bank_account_id: int,
+    format: str = Query("ndjson", description="ndjson | csv"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_principal)
+):
+    await ensure_account_owner(db, bank_account_id, current_user.id)
+    stmt = (
+        select(*[getattr(Transaction, c) for c in TRANSACTION_COLUMNS])
+        .where(Transaction.bank_account_id == bank_account_id)
+        .order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+    )
+    return export_response(stmt, TRANSACTION_COLUMNS, format, f"transactions_{bank_account_id}")
@@ -0,0 +1,138 @@
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from backend.bank import apply_balance_deltas
+from backend.database import AsyncSessionLocal, BankAccount, Transaction
+from backend.logging_module import logger
+from backend import metrics
+from backend.config import BANK_FAKE_PROVIDER
+
+# ────────────── 은행 거래 동기화 (Celery 작업에서 실행) ──────────────
+
+class BankProvider(ABC):
+    """거래 제공자 인터페이스. account는 계좌 정보 dict(id, external_id, external_token).
+
+    추상 클래스이므로 fetch_transactions를 구현하지 않은 제공자는 PROVIDERS에 등록(인스턴스 생성)할 때 실패한다.
+    """
+
+    @abstractmethod
+    async def fetch_transactions(self, account: dict, cursor: Optional[str]) -> Tuple[List[dict], Optional[str]]:
+        """cursor 이후 새 거래 목록과 다음 cursor 반환.
+
+        거래 dict: external_id, amount, description, timestamp(naive UTC)
+        """
+
+class FakeBankProvider(BankProvider):
+    """로컬 개발/테스트용. 계좌마다 interval 간격으로 항상 같은 거래를 만들어 낸다 (cursor = 마지막 거래 순번)"""
+    EPOCH = datetime(2024, 1, 1)
+
+    def __init__(self, interval: timedelta = timedelta(hours=6), history: timedelta = timedelta(days=30),
+                 latency: float = 0.0):
+        self.interval = interval
+        self.history = history
+        self.latency = latency
+
+    def _transaction(self, account_id: int, seq: int) -> dict:
+        rng = random.Random(f"{account_id}-{seq}")
+        income = rng.random() < 0.1
+        return {
+            "external_id": f"fake-{account_id}-{seq}",
+            "amount": round(rng.uniform(100000, 3000000) if income else -rng.uniform(1000, 80000), -2),
+            "description": "더미 입금 내역" if income else "더미 지출 내역",
+            "timestamp": self.EPOCH + self.interval * seq,
+        }
+
+    async def fetch_transactions(self, account, cursor):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        now = datetime.utcnow()
+        last = int((now - self.EPOCH) / self.interval)
+        start = int(cursor) + 1 if cursor else int((now - self.history - self.EPOCH) / self.interval)
+        transactions = [self._transaction(account["id"], seq) for seq in range(start, last + 1)]
+        return transactions, str(last) if transactions else cursor
+
+# BankAccount.provider → 제공자 (실제 은행 API 연동 시 여기에 등록).
+# 등록되지 않은 제공자의 계좌는 동기화하지 않는다. BankAccount.provider 기본값이 "sample"이므로
+# 가짜 제공자는 개발/테스트 설정(BANK_FAKE_PROVIDER)일 때만 등록 → 실제 계좌에 더미 거래가 들어가지 않게
+PROVIDERS = {}
+if BANK_FAKE_PROVIDER:
+    PROVIDERS["sample"] = FakeBankProvider()
+
+def get_provider(name: Optional[str]) -> BankProvider:
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        raise ValueError(f"알 수 없는 은행 제공자: {name}")
+    return provider
+
+def dedupe(transactions: List[dict]) -> List[dict]:
+    """같은 응답 안의 중복 external_id 제거 (먼저 온 것 유지)"""
+    seen, unique = set(), []
+    for tx in transactions:
+        if tx["external_id"] not in seen:
+            seen.add(tx["external_id"])
+            unique.append(tx)
+    return unique
+
+async def sync_account(account: dict, semaphore: asyncio.Semaphore) -> dict:
+    """계좌 하나의 새 거래를 받아 일괄 upsert, 새로 들어간 거래만큼 잔액 반영, cursor 갱신"""
+    provider = get_provider(account["provider"])
+    async with semaphore:
+        transactions, next_cursor = await provider.fetch_transactions(account, account["sync_cursor"])
+    transactions = dedupe(transactions)
+
+    inserted = 0
+    async with AsyncSessionLocal() as db:
+        if transactions:
+            # 이미 받은 거래(계좌, external_id)는 무시 → 재시도/겹치는 구간도 안전
+            stmt = (
+                insert(Transaction)
+                .values([{**tx, "bank_account_id": account["id"]} for tx in transactions])
+                .on_conflict_do_nothing(index_elements=["bank_account_id", "external_id"])
+                .returning(Transaction.amount)
+            )
+            amounts = (await db.execute(stmt)).scalars().all()
+            inserted = len(amounts)
+            if amounts:
+                await apply_balance_deltas(db, {account["id"]: sum(amounts)})
+        await db.execute(
+            update(BankAccount)
+            .where(BankAccount.id == account["id"])
+            .values(sync_cursor=next_cursor, last_synced_at=datetime.utcnow())
+        )
+        await db.commit()
+    return {"account_id": account["id"], "fetched": len(transactions), "inserted": inserted}
+
+async def sync_accounts(account_ids: Optional[List[int]] = None, concurrency: int = 8) -> dict:
+    """account_ids(없으면 전체) 중 등록된 제공자의 계좌를 최대 concurrency개씩 동시에 동기화. 계좌별 실패는 기록만 하고 계속"""
+    stmt = select(
+        BankAccount.id, BankAccount.provider, BankAccount.external_id,
+        BankAccount.external_token, BankAccount.sync_cursor,
+    ).where(BankAccount.provider.in_(list(PROVIDERS))).order_by(BankAccount.id)
+    if not PROVIDERS:
+        logger.info("bank sync: 등록된 은행 제공자가 없어 건너뜀")
+        return {"accounts": 0, "fetched": 0, "inserted": 0, "failed": []}
+    if account_ids is not None:
+        stmt = stmt.where(BankAccount.id.in_(account_ids))
+    async with AsyncSessionLocal() as db:
+        accounts = [dict(row._mapping) for row in (await db.execute(stmt)).all()]
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results = await asyncio.gather(*(sync_account(a, semaphore) for a in accounts), return_exceptions=True)
+
+    summary = {"accounts": len(accounts), "fetched": 0, "inserted": 0, "failed": []}
+    for account, result in zip(accounts, results):
+        if isinstance(result, Exception):
+            logger.error(f"bank sync failed: account_id={account['id']} error={result!r}")
+            summary["failed"].append(account["id"])
+            continue
+        summary["fetched"] += result["fetched"]
+        summary["inserted"] += result["inserted"]
+    metrics.inc("bank_sync_transactions_inserted", summary["inserted"])
+    metrics.inc("bank_sync_failures", len(summary["failed"]))
+    logger.info(f"bank sync: {summary}")
+    return summary
@@ -0,0 +1,145 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from backend import metrics
+from backend.logging_module import logger
+
+# ────────────── LRU + TTL 캐시 (프로세스 메모리 / Redis) ──────────────
+# 두 백엔드 모두 get/set/delete/clear 동일 인터페이스. 값이 없으면 get()은 None.
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 600.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > now:
+                self._data.move_to_end(key)
+                metrics.inc(f"cache.{self.name}.hits")
+                return item[1]
+            if item is not None:
+                del self._data[key]
+        metrics.inc(f"cache.{self.name}.misses")
+        return None
+
+    def set(self, key, value, ttl: float = None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                metrics.inc(f"cache.{self.name}.evictions")
+            metrics.set_gauge(f"cache.{self.name}.size", len(self._data))
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            metrics.set_gauge(f"cache.{self.name}.size", 0)
+
+
+class RedisCache:
+    """uvicorn 워커 간 캐시 공유용. 크기 제한은 Redis maxmemory-policy(allkeys-lru)에 맡긴다."""
+
+    def __init__(self, name: str, url: str, ttl: float = 600.0):
+        import redis
+        self.name = name
+        self.ttl = ttl
+        self.prefix = f"nextstep:cache:{name}:"
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        try:
+            raw = self._client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"redis cache {self.name} get 실패: {e}")
+            raw = None
+        if raw is None:
+            metrics.inc(f"cache.{self.name}.misses")
+            return None
+        metrics.inc(f"cache.{self.name}.hits")
+        return pickle.loads(raw)
+
+    def set(self, key, value, ttl: float = None):
+        try:
+            self._client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except Exception as e:
+            logger.warning(f"redis cache {self.name} set 실패: {e}")
+
+    def delete(self, key):
+        try:
+            self._client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"redis cache {self.name} delete 실패: {e}")
+
+    def clear(self):
+        try:
+            for key in self._client.scan_iter(match=self.prefix + "*"):
+                self._client.delete(key)
+        except Exception as e:
+            logger.warning(f"redis cache {self.name} clear 실패: {e}")
+
+
+class RedisInvalidator:
+    """프로세스 메모리 캐시(uvicorn 워커별)의 삭제를 Redis pub/sub으로 다른 워커에 전파.
+
+    Redis 연결이 끊긴 동안 놓친 삭제는 전파되지 않으므로 그 사이에는 캐시 TTL이 상한이 된다.
+    """
+
+    def __init__(self, cache, url: str, channel: str):
+        import redis
+        self.cache = cache
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def publish(self, key: str):
+        self.cache.delete(key)
+        try:
+            self._client.publish(self.channel, key)
+        except Exception as e:
+            logger.warning(f"cache invalidation publish 실패 ({self.channel}): {e}")
+
+    def _listen(self):
+        backoff = 1.0
+        while not self._stopped.is_set():
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 1.0
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.cache.delete(message["data"].decode("utf-8"))
+                        metrics.inc(f"cache.{self.cache.name}.remote_invalidations")
+                pubsub.close()
+            except Exception as e:
+                logger.warning(f"cache invalidation 구독 끊김 ({self.channel}), {backoff:.0f}s 후 재연결: {e}")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._listen, name=f"invalidate-{self.channel}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def make_cache(name: str, backend: str, maxsize: int, ttl: float, redis_url: str = None):
+    if backend == "redis":
+        return RedisCache(name, redis_url, ttl=ttl)
+    return TTLCache(name, maxsize=maxsize, ttl=ttl)
@@ -13,3 +13,70 @@ BANK_CLIENT_ID = os.getenv("BANK_CLIENT_ID")
 BANK_CLIENT_SECRET = os.getenv("BANK_CLIENT_SECRET")
 BANK_REDIRECT_URI = os.getenv("BANK_REDIRECT_URI")
 BOKJIRO_API_KEY = os.getenv("BOKJIRO_API_KEY")
+# /recommend 쿼리 인코더 마이크로 배치 설정
+ENCODER_MAX_BATCH_SIZE = int(os.getenv("ENCODER_MAX_BATCH_SIZE", "16"))
+ENCODER_MAX_WAIT_MS = float(os.getenv("ENCODER_MAX_WAIT_MS", "5"))
+# /recommend 쿼리 임베딩·추천 결과 캐시 (memory | redis)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", CELERY_BROKER_URL)
+RECOMMEND_CACHE_BACKEND = os.getenv("RECOMMEND_CACHE_BACKEND", "memory")
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "1024"))
+RECOMMEND_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", "600"))
+# 이 배포에서 서빙할 라우터 (쉼표 구분, 비우면 전체). 예: "auth,users,bank,spending"
+ENABLED_ROUTERS = [r.strip() for r in os.getenv("ENABLED_ROUTERS", "").split(",") if r.strip()]
+# 서버 기동 후 백그라운드에서 미리 로드할 서브시스템. 예: "policy_index,policy_encoder,forecast"
+WARMUP_SUBSYSTEMS = [s.strip() for s in os.getenv("WARMUP_SUBSYSTEMS", "").split(",") if s.strip()]
+# 새 정책 인덱스 버전(CURRENT) 확인 주기(초)
+INDEX_RELOAD_INTERVAL = float(os.getenv("INDEX_RELOAD_INTERVAL", "30"))
+# /recommend 최종 점수 = SIM_WEIGHT * 코사인 유사도 + TAG_WEIGHT * (일치 태그 수 / 쿼리 태그 수)
+RERANK_SIM_WEIGHT = float(os.getenv("RERANK_SIM_WEIGHT", "1.0"))
+RERANK_TAG_WEIGHT = float(os.getenv("RERANK_TAG_WEIGHT", "1.0"))
+# 쿼리 태그가 있으면 해당 태그를 가진 정책 안에서만 검색. 후보가 MIN_SIZE 미만이면 전체 검색으로 대체
+RECOMMEND_FILTERED_SEARCH = os.getenv("RECOMMEND_FILTERED_SEARCH", "true").lower() == "true"
+RECOMMEND_FILTER_MIN_SIZE = int(os.getenv("RECOMMEND_FILTER_MIN_SIZE", "20"))
+# /recommend 쿼리 인코더 백엔드 (torch | int8 | onnx)
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")
+ENCODER_ONNX_PATH = os.getenv("ENCODER_ONNX_PATH", "data/kobert_encoder.onnx")
+# /forecast Prophet 프로세스 풀
+FORECAST_POOL_WORKERS = int(os.getenv("FORECAST_POOL_WORKERS", "2"))
+FORECAST_MAX_QUEUE = int(os.getenv("FORECAST_MAX_QUEUE", "4"))
+FORECAST_TIMEOUT = float(os.getenv("FORECAST_TIMEOUT", "30"))
+FORECAST_RETRY_AFTER = int(os.getenv("FORECAST_RETRY_AFTER", "5"))
+# /forecast 결과 캐시 (memory | redis | db). VERSION을 바꾸면 기존 캐시 전체 무효화
+FORECAST_CACHE_BACKEND = os.getenv("FORECAST_CACHE_BACKEND", "memory")
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "512"))
+FORECAST_CACHE_TTL = float(os.getenv("FORECAST_CACHE_TTL", "3600"))
+FORECAST_CACHE_VERSION = os.getenv("FORECAST_CACHE_VERSION", "1")
+# /forecast/batch 한 번에 받을 최대 시계열 수
+FORECAST_BATCH_MAX_SERIES = int(os.getenv("FORECAST_BATCH_MAX_SERIES", "1000"))
+# 예측 기간(periods) 상한, 경량 엔진이 시계열마다 사용할 최근 일수
+FORECAST_MAX_PERIODS = int(os.getenv("FORECAST_MAX_PERIODS", "365"))
+FORECAST_FAST_WINDOW_DAYS = int(os.getenv("FORECAST_FAST_WINDOW_DAYS", "730"))
+# 야간 사전 예측 (Celery precompute_forecasts)
+FORECAST_PRECOMPUTE_PERIODS = int(os.getenv("FORECAST_PRECOMPUTE_PERIODS", "30"))
+FORECAST_PRECOMPUTE_CHUNK = int(os.getenv("FORECAST_PRECOMPUTE_CHUNK", "500"))
+# POST /bank/transactions/bulk 한 번에 받을 최대 거래 수
+BANK_BULK_MAX_ROWS = int(os.getenv("BANK_BULK_MAX_ROWS", "5000"))
+# 은행 거래 동기화 (Celery sync_bank_accounts): 동시에 조회할 계좌 수, 실행 주기(초)
+BANK_SYNC_CONCURRENCY = int(os.getenv("BANK_SYNC_CONCURRENCY", "8"))
+BANK_SYNC_INTERVAL = float(os.getenv("BANK_SYNC_INTERVAL", "3600"))
+# 개발/테스트용: provider="sample" 계좌를 가짜 제공자(더미 거래 생성)로 동기화
+BANK_FAKE_PROVIDER = os.getenv("BANK_FAKE_PROVIDER", "false").lower() == "true"
+# 인증 principal 캐시 (memory | redis). 토큰 subject별로 사용자 조회 결과를 TTL(초) 동안 재사용
+PRINCIPAL_CACHE_BACKEND = os.getenv("PRINCIPAL_CACHE_BACKEND", "memory")
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+# memory 백엔드일 때 invalidate_principal()을 다른 워커에 전파 (Redis pub/sub, CACHE_REDIS_URL 사용)
+PRINCIPAL_INVALIDATION_PUBSUB = os.getenv("PRINCIPAL_INVALIDATION_PUBSUB", "true").lower() == "true"
+# 비밀번호 해시 (bcrypt cost, 전용 스레드 수, 빈 자리 대기 한도(초)). ROUNDS를 바꾸면 로그인 시 자동 재해시
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+# DB 엔진/커넥션 풀. ECHO는 모든 SQL을 출력하므로 개발용
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# 이 시간(ms) 이상 걸린 쿼리는 slow_query 이벤트로 로그
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
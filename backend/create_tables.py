@@ -1,10 +1,34 @@
 # create_tables.py
 import asyncio
+from sqlalchemy import text
 from backend.database import engine, Base
 
+# create_all은 이미 있는 테이블에 새 컬럼을 추가하지 않으므로, 모델에 컬럼을 추가하면 여기에도 적는다.
+# (테이블, 컬럼 정의) — PostgreSQL ADD COLUMN IF NOT EXISTS라 여러 번 실행해도 안전
+ADDED_COLUMNS = [
+    ("users", "token_version INTEGER NOT NULL DEFAULT 0"),
+    ("users", "is_admin BOOLEAN NOT NULL DEFAULT false"),
+    ("forecast_logs", "request_hash VARCHAR"),
+    ("bank_accounts", "sync_cursor VARCHAR"),
+    ("bank_accounts", "last_synced_at TIMESTAMP WITHOUT TIME ZONE"),
+    ("transactions", "external_id VARCHAR"),
+]
+
+def add_missing_columns(sync_conn):
+    for table, column in ADDED_COLUMNS:
+        sync_conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}"))
+
+def create_missing_indexes(sync_conn):
+    # create_all은 이미 있는 테이블에 새로 추가된 인덱스를 만들지 않으므로 따로 생성
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 async def run():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)     # 새 컬럼에 거는 인덱스가 있으므로 인덱스보다 먼저
+        await conn.run_sync(create_missing_indexes)
 
 if __name__ == "__main__":
     asyncio.run(run())
@@ -1,11 +1,23 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, JSON, Index, text
 from datetime import datetime
-from backend.config import DATABASE_URL
+from backend.config import (
+    DATABASE_URL, DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_SLOW_QUERY_MS,
+)
+from backend.db_instrumentation import InstrumentedQueuePool, instrument_engine
 
 Base = declarative_base()
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+)
+instrument_engine(engine.sync_engine, DB_SLOW_QUERY_MS)
 AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
@@ -19,6 +31,8 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, default=0, server_default=text("0"), nullable=False)   # 올리면 기존 토큰/principal 캐시 무효화
+    is_admin = Column(Boolean, default=False, server_default=text("false"), nullable=False)
     spending_records = relationship("SpendingRecord", back_populates="user")
     bank_accounts = relationship("BankAccount", back_populates="user")
 
@@ -30,16 +44,31 @@ class SpendingRecord(Base):
     category = Column(String)
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="spending_records")
+    # 사용자별 기간 조회/집계용
+    __table_args__ = (Index("ix_spending_records_user_id_date", "user_id", "date"),)
 
 class ForecastLog(Base):
     __tablename__ = "forecast_logs"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     request_data = Column(String)      # 입력값(JSON string)
+    request_hash = Column(String, index=True, nullable=True)  # 정규화 입력 해시 (forecast_cache.fingerprint)
     response_data = Column(JSON)       # 결과값(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     user = relationship("User")
 
+class Forecast(Base):
+    """사용자별 사전 계산 지출 예측 (nightly precompute_forecasts 작업이 갱신)"""
+    __tablename__ = "forecasts"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True)
+    engine = Column(String)
+    periods = Column(Integer)
+    last_record_id = Column(Integer)   # 예측에 반영된 마지막 SpendingRecord.id (이후 새 지출이 있으면 재계산)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+    result = Column(JSON)              # ForecastResponseItem 목록
+    user = relationship("User")
+
 class RecommendLog(Base):
     __tablename__ = "recommend_logs"
     id = Column(Integer, primary_key=True, index=True)
@@ -58,6 +87,8 @@ class BankAccount(Base):
     provider = Column(String, default="sample")   # "sample" or 실제 API 제공자
     external_id = Column(String, nullable=True)   # 실제 연동 시 계좌 식별자
     external_token = Column(String, nullable=True)
+    sync_cursor = Column(String, nullable=True)     # 제공자별 증분 동기화 위치 (마지막으로 받은 거래)
+    last_synced_at = Column(DateTime, nullable=True)
     user = relationship("User", back_populates="bank_accounts")
     transactions = relationship("Transaction", back_populates="account")
 
@@ -69,4 +100,10 @@ class Transaction(Base):
     amount = Column(Float)
     description = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    external_id = Column(String, nullable=True)     # 제공자 거래 id (동기화 중복 제거용)
     account = relationship("BankAccount", back_populates="transactions")
+    __table_args__ = (
+        # 계좌별 최신순 keyset 페이지네이션용
+        Index("ix_transactions_account_timestamp", "bank_account_id", "timestamp"),
+        Index("uq_transactions_account_external_id", "bank_account_id", "external_id", unique=True),
+    )
@@ -0,0 +1,84 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from backend import metrics
+from backend.logging_module import log_event
+
+# ────────────── DB 엔진 계측: 쿼리 시간, 느린 쿼리, 요청별 통계, 커넥션 풀 ──────────────
+
+# 요청 하나 동안 누적되는 {"queries": n, "db_ms": t}. 미들웨어가 요청 시작 시 새 dict를 넣는다.
+# (엔드포인트/greenlet은 컨텍스트를 복사해 실행되므로 값을 바꾸지 않고 dict를 직접 갱신)
+_request_stats: ContextVar[Optional[dict]] = ContextVar("db_request_stats", default=None)
+
+SLOW_QUERY_MAX_CHARS = 1000
+
+def start_request_stats():
+    return _request_stats.set({"queries": 0, "db_ms": 0.0})
+
+def end_request_stats(token) -> dict:
+    stats = _request_stats.get()
+    _request_stats.reset(token)
+    return stats
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _make_after_cursor_execute(slow_query_ms: float):
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        metrics.inc("db.queries")
+        metrics.observe("db.query_ms", elapsed_ms)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats["queries"] += 1
+            stats["db_ms"] += elapsed_ms
+        if elapsed_ms >= slow_query_ms:
+            metrics.inc("db.slow_queries")
+            log_event(
+                "slow_query",
+                duration_ms=round(elapsed_ms, 1),
+                statement=" ".join(statement.split())[:SLOW_QUERY_MAX_CHARS],
+                executemany=executemany,
+            )
+    return _after_cursor_execute
+
+def _handle_error(context):
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각만 정리
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+    metrics.inc("db.errors")
+
+def instrument_engine(sync_engine, slow_query_ms: float):
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _make_after_cursor_execute(slow_query_ms))
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """커넥션 체크아웃 대기 시간과 풀 포화도를 metrics로 내보내는 풀"""
+
+    def _update_gauges(self):
+        checked_out = self.checkedout()
+        capacity = self.size() + max(self._max_overflow, 0)
+        metrics.set_gauge("db.pool.checked_out", checked_out)
+        metrics.set_gauge("db.pool.overflow", max(0, self.overflow()))
+        metrics.set_gauge("db.pool.saturation", checked_out / capacity if capacity > 0 else 0.0)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            metrics.inc("db.pool.timeouts")
+            log_event("db_pool_timeout", waited_ms=round((time.perf_counter() - started) * 1000, 1),
+                      checked_out=self.checkedout(), size=self.size())
+            raise
+        metrics.observe("db.pool.checkout_wait_ms", (time.perf_counter() - started) * 1000)
+        self._update_gauges()
+        return conn
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._update_gauges()
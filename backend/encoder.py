@@ -0,0 +1,74 @@
+from typing import List
+import numpy as np
+
+# ────────────── KoBERT 쿼리 인코더 백엔드 ──────────────
+# torch: 기본 fp32 PyTorch / int8: 동적 양자화(Linear → qint8) / onnx: onnxruntime (scripts/export_encoder.py로 export)
+# 모든 백엔드가 같은 mean pooling(패딩 제외) + L2 정규화를 거쳐 (n, dim) float32를 돌려준다.
+MODEL_ID = "monologg/kobert"
+MAX_LENGTH = 512
+ENCODER_BACKENDS = ("torch", "int8", "onnx")
+
+def mean_pool_normalize(hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    mask = mask[..., None].astype(hidden.dtype)
+    out = (hidden * mask).sum(axis=1) / mask.sum(axis=1)
+    out = out / (np.linalg.norm(out, axis=1, keepdims=True) + 1e-10)
+    return out.astype("float32")
+
+def load_tokenizer():
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(MODEL_ID, trust_remote_code=True)
+
+
+class TorchEncoder:
+    def __init__(self, quantize: bool = False, num_threads: int = 1):
+        import torch
+        from transformers import AutoModel
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # 프로세스에서 이미 병렬 연산이 시작된 뒤에는 바꿀 수 없음
+        self.tokenizer = load_tokenizer()
+        model = AutoModel.from_pretrained(MODEL_ID, trust_remote_code=True)
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self.name = "int8" if quantize else "torch"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        import torch
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=MAX_LENGTH)
+        with torch.no_grad():
+            hidden = self.model(**inputs).last_hidden_state.numpy()
+        return mean_pool_normalize(hidden, inputs["attention_mask"].numpy())
+
+
+class OnnxEncoder:
+    def __init__(self, path: str, num_threads: int = 1):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = load_tokenizer()
+        self.name = "onnx"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        inputs = self.tokenizer(texts, return_tensors="np", padding=True, truncation=True, max_length=MAX_LENGTH)
+        feed = {k: v.astype("int64") for k, v in inputs.items() if k in self.input_names}
+        if "token_type_ids" in self.input_names and "token_type_ids" not in feed:
+            feed["token_type_ids"] = np.zeros_like(feed["input_ids"])
+        hidden = self.session.run(["last_hidden_state"], feed)[0]
+        return mean_pool_normalize(hidden, inputs["attention_mask"])
+
+
+def load_encoder(backend: str = "torch", onnx_path: str = None, num_threads: int = 1):
+    if backend == "torch":
+        return TorchEncoder(num_threads=num_threads)
+    if backend == "int8":
+        return TorchEncoder(quantize=True, num_threads=num_threads)
+    if backend == "onnx":
+        return OnnxEncoder(onnx_path, num_threads=num_threads)
+    raise ValueError(f"지원하지 않는 인코더 백엔드: {backend} (가능: {', '.join(ENCODER_BACKENDS)})")
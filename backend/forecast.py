@@ -1,49 +1,154 @@
+import asyncio
+from functools import partial
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.encoders import jsonable_encoder
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.database import get_db, ForecastLog, User
-from backend.schemas import ForecastRequestSchema, ForecastResponseItem
-from backend.auth import get_current_user
-import pandas as pd
-from prophet import Prophet
+from sqlalchemy.future import select
+from backend.database import get_db, ForecastLog, Forecast
+from backend.schemas import (
+    ForecastRequestSchema, ForecastResponseItem, ForecastBatchRequestSchema, ForecastBatchResponseItem,
+    Principal,
+)
+from backend.auth import get_current_principal, require_admin
+from backend import subsystems
+from backend.forecast_pool import ForecastPool, PoolSaturated, WorkerCrashed, fit_prophet
+from backend.forecast_cache import ForecastCache, fingerprint
+from backend.fast_forecast import forecast_batch
+from backend import metrics
+from backend.logging_module import logger
+from backend.config import (
+    FORECAST_POOL_WORKERS, FORECAST_MAX_QUEUE, FORECAST_TIMEOUT, FORECAST_RETRY_AFTER, CACHE_REDIS_URL,
+    FORECAST_CACHE_BACKEND, FORECAST_CACHE_SIZE, FORECAST_CACHE_TTL, FORECAST_CACHE_VERSION,
+    FORECAST_BATCH_MAX_SERIES, FORECAST_FAST_WINDOW_DAYS,
+)
 
 router = APIRouter(prefix="/forecast", tags=["forecast"])
 
+FORECAST_ENGINES = ("prophet", "fast", "auto")
+
+def load_forecast_pool():
+    # pandas + prophet(cmdstan)은 풀 워커 프로세스에서만 import → API 프로세스는 가볍게 유지
+    return ForecastPool(max_workers=FORECAST_POOL_WORKERS, max_queue=FORECAST_MAX_QUEUE, timeout=FORECAST_TIMEOUT)
+
+subsystems.register("forecast", load_forecast_pool)
+
+forecast_cache = ForecastCache(FORECAST_CACHE_BACKEND, FORECAST_CACHE_SIZE, FORECAST_CACHE_TTL, CACHE_REDIS_URL)
+
+@router.on_event("shutdown")
+async def shutdown_forecast_pool():
+    if subsystems.is_loaded("forecast"):
+        subsystems.get("forecast").shutdown()
+
+async def run_prophet(req: ForecastRequestSchema) -> List[ForecastResponseItem]:
+    pool = await subsystems.aget("forecast")
+    try:
+        rows = await pool.run(fit_prophet, [item.dict() for item in req.data], req.periods)
+    except PoolSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="예측 요청이 많습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(FORECAST_RETRY_AFTER)},
+        )
+    except WorkerCrashed:
+        # 풀은 이미 새로 만들어졌으므로 재시도하면 처리됨
+        raise HTTPException(
+            status_code=503,
+            detail="예측 작업이 중단되었습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(FORECAST_RETRY_AFTER)},
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="예측 시간이 초과되었습니다.")
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 시계열 데이터입니다.")
+    return [ForecastResponseItem(**row) for row in rows]
+
+async def run_fast(series: List[list], periods: int) -> List[List[ForecastResponseItem]]:
+    """벡터화 엔진으로 여러 시계열을 한 번에 예측 (큰 배치도 이벤트 루프를 막지 않게 스레드에서)"""
+    if any(not points for points in series):
+        raise HTTPException(status_code=400, detail="잘못된 시계열 데이터입니다.")
+    try:
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, partial(forecast_batch, series, periods, window=FORECAST_FAST_WINDOW_DAYS)
+        )
+    except (OverflowError, ValueError):
+        # 예측 날짜가 datetime 범위를 넘는 경우 등
+        raise HTTPException(status_code=400, detail="잘못된 시계열 데이터입니다.")
+    return [[ForecastResponseItem(**row) for row in rows] for rows in results]
+
+async def run_engine(req: ForecastRequestSchema):
+    """(예측 결과, 실제로 실행된 엔진). auto는 Prophet 풀이 바쁘면 fast로 대체"""
+    if req.engine not in FORECAST_ENGINES:
+        raise HTTPException(status_code=400, detail=f"engine은 {', '.join(FORECAST_ENGINES)} 중 하나여야 합니다.")
+    if req.engine == "auto":
+        pool = await subsystems.aget("forecast")
+        if not pool.is_busy():
+            try:
+                return await run_prophet(req), "prophet"
+            except HTTPException as e:
+                if e.status_code != 503:
+                    raise
+        metrics.inc("forecast.fast_fallback")
+    elif req.engine == "prophet":
+        return await run_prophet(req), "prophet"
+    return (await run_fast([[(item.ds, item.y) for item in req.data]], req.periods))[0], "fast"
+
 @router.post("/", response_model=List[ForecastResponseItem], summary="지출 예측")
 async def forecast(
     req: ForecastRequestSchema,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
-    try:
-        df = pd.DataFrame([item.dict() for item in req.data])
-        df["ds"] = pd.to_datetime(df["ds"])
-    except Exception:
-        raise HTTPException(status_code=400, detail="잘못된 시계열 데이터입니다.")
+    key = fingerprint(req, FORECAST_CACHE_VERSION, engine=req.engine)
+    cached = await forecast_cache.get(key, db)
+    if cached is not None:
+        return cached
 
-    m = Prophet()
-    m.fit(df)
-    future = m.make_future_dataframe(periods=req.periods)
-    fc = m.predict(future)
-
-    recent = fc[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(req.periods)
-    response_list = [
-        ForecastResponseItem(
-            ds=row["ds"].to_pydatetime(),
-            yhat=float(row["yhat"]),
-            yhat_lower=float(row["yhat_lower"]),
-            yhat_upper=float(row["yhat_upper"]),
-        )
-        for _, row in recent.iterrows()
-    ]
+    response_list, engine = await run_engine(req)
+    if req.engine == "auto" and engine != "prophet":
+        # 풀이 바빠서 대체된 결과는 auto 키에 두지 않는다 (풀이 한가해지면 auto는 다시 Prophet으로)
+        key = fingerprint(req, FORECAST_CACHE_VERSION, engine=engine)
+    response_data = jsonable_encoder(response_list)
+    forecast_cache.set(key, response_data)
     try:
         log_entry = ForecastLog(
             user_id=current_user.id,
             request_data=req.json(),
-            response_data=[item.dict() for item in response_list],
+            request_hash=key,
+            response_data=response_data,
         )
         db.add(log_entry)
         await db.commit()
-    except Exception:
+    except Exception as e:
+        # 로그 저장 실패로 예측 응답까지 실패시키지는 않지만, 조용히 넘기지 않는다 (db 캐시 계층도 이 테이블을 씀)
+        logger.error(f"forecast log 저장 실패: user_id={current_user.id} error={e!r}")
+        metrics.inc("forecast.log_errors")
         await db.rollback()
     return response_list
+
+@router.get("/me", response_model=List[ForecastResponseItem], summary="내 지출 예측 (야간 사전 계산)")
+async def my_forecast(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(select(Forecast.result).where(Forecast.user_id == current_user.id))
+    rows = result.scalars().first()
+    if rows is None:
+        raise HTTPException(status_code=404, detail="아직 계산된 예측이 없습니다.")
+    return rows
+
+@router.post("/batch", response_model=List[ForecastBatchResponseItem], summary="여러 시계열 일괄 예측 (경량 엔진)")
+async def forecast_many(
+    req: ForecastBatchRequestSchema,
+    current_user: Principal = Depends(get_current_principal),
+):
+    if len(req.series) > FORECAST_BATCH_MAX_SERIES:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {FORECAST_BATCH_MAX_SERIES}개 시계열까지 예측할 수 있습니다.")
+    results = await run_fast([[(item.ds, item.y) for item in s.data] for s in req.series], req.periods)
+    return [ForecastBatchResponseItem(id=s.id, forecast=rows) for s, rows in zip(req.series, results)]
+
+@router.delete("/cache", summary="예측 결과 캐시 비우기")
+async def clear_forecast_cache(current_user: Principal = Depends(require_admin)):
+    # db 백엔드의 기존 로그는 FORECAST_CACHE_VERSION 변경으로 무효화
+    forecast_cache.clear()
+    return {"cleared": True}
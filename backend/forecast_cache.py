@@ -0,0 +1,63 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from backend import metrics
+from backend.cache import TTLCache, RedisCache
+from backend.database import ForecastLog
+from backend.schemas import ForecastRequestSchema
+
+# ────────────── /forecast 결과 캐시 ──────────────
+# 같은 시계열 + periods면 같은 결과이므로 정규화한 입력의 해시를 키로 쓴다.
+# 프로세스 메모리(LRU+TTL)를 1차로 두고, 설정에 따라 Redis 또는 forecast_logs 테이블을 2차로 조회한다.
+
+def fingerprint(req: ForecastRequestSchema, version: str, engine: str = "prophet") -> str:
+    """입력 순서/표기와 무관한 정규화 해시 (ds 기준 정렬, ISO 날짜, float repr)"""
+    points = sorted((item.ds.isoformat(), repr(float(item.y))) for item in req.data)
+    canonical = json.dumps({"v": version, "engine": engine, "periods": req.periods, "data": points}, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ForecastCache:
+    def __init__(self, backend: str = "memory", maxsize: int = 512, ttl: float = 3600.0, redis_url: str = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.memory = TTLCache("forecast", maxsize=maxsize, ttl=ttl)
+        self.redis = RedisCache("forecast", redis_url, ttl=ttl) if backend == "redis" else None
+
+    async def get(self, key: str, db: AsyncSession) -> Optional[List[dict]]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.redis is not None:
+            value = self.redis.get(key)
+        elif self.backend == "db":
+            value = await self._get_from_db(key, db)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    async def _get_from_db(self, key: str, db: AsyncSession):
+        since = datetime.utcnow() - timedelta(seconds=self.ttl)
+        result = await db.execute(
+            select(ForecastLog.response_data)
+            .where(ForecastLog.request_hash == key, ForecastLog.created_at >= since)
+            .order_by(ForecastLog.created_at.desc())
+            .limit(1)
+        )
+        value = result.scalars().first()
+        metrics.inc("cache.forecast_db.hits" if value is not None else "cache.forecast_db.misses")
+        return value
+
+    def set(self, key: str, value: List[dict]):
+        # db 백엔드는 forecast 핸들러가 남기는 ForecastLog(request_hash) 자체가 저장소
+        self.memory.set(key, value)
+        if self.redis is not None:
+            self.redis.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.redis is not None:
+            self.redis.clear()
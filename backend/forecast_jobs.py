@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from backend.database import AsyncSessionLocal, SpendingRecord, Forecast
+from backend.fast_forecast import forecast_batch
+from backend.logging_module import logger
+
+# ────────────── 사용자별 지출 예측 사전 계산 (Celery 작업에서 실행) ──────────────
+
+async def find_stale_users(chunk_size: int) -> List[List[int]]:
+    """마지막 예측 이후 새 지출이 생긴 사용자 id를 chunk_size 단위로 묶어 반환"""
+    latest = (
+        select(SpendingRecord.user_id, func.max(SpendingRecord.id).label("last_id"))
+        .group_by(SpendingRecord.user_id)
+        .subquery()
+    )
+    stmt = (
+        select(latest.c.user_id)
+        .outerjoin(Forecast, Forecast.user_id == latest.c.user_id)
+        .where(or_(Forecast.id.is_(None), Forecast.last_record_id < latest.c.last_id))
+        .order_by(latest.c.user_id)
+        .execution_options(yield_per=chunk_size)
+    )
+    chunks = []
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for partition in result.partitions(chunk_size):
+            chunks.append([row.user_id for row in partition])
+    return chunks
+
+async def forecast_users(user_ids: List[int], periods: int, engine: str = "fast") -> int:
+    """user_ids의 지출을 DB에서 일 단위로 합산해 한 번에 예측하고 forecasts 테이블에 upsert"""
+    day = func.date_trunc("day", SpendingRecord.date).label("day")
+    stmt = (
+        select(SpendingRecord.user_id, day, func.sum(SpendingRecord.amount), func.max(SpendingRecord.id))
+        .where(SpendingRecord.user_id.in_(user_ids))
+        .group_by(SpendingRecord.user_id, day)
+        .order_by(SpendingRecord.user_id, day)
+    )
+    series, last_ids = {}, {}
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for user_id, ds, amount, last_id in result:
+            series.setdefault(user_id, []).append((ds, float(amount or 0.0)))
+            last_ids[user_id] = max(last_ids.get(user_id, 0), last_id)
+        if not series:
+            return 0
+
+        ids = list(series)
+        forecasts = forecast_batch([series[u] for u in ids], periods)
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": u,
+                "engine": engine,
+                "periods": periods,
+                "last_record_id": last_ids[u],
+                "generated_at": now,
+                "result": jsonable_encoder(fc),
+            }
+            for u, fc in zip(ids, forecasts)
+        ]
+        stmt = insert(Forecast).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Forecast.user_id],
+            set_={c: stmt.excluded[c] for c in ("engine", "periods", "last_record_id", "generated_at", "result")},
+        )
+        await db.execute(stmt)
+        await db.commit()
+    logger.info(f"precomputed forecasts for {len(rows)} users")
+    return len(rows)
@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+from backend import metrics
+
+# ────────────── Prophet 학습/예측용 프로세스 풀 ──────────────
+# 자식 프로세스에서 실행되는 함수는 pickle 가능해야 하므로 모듈 최상위에 둔다.
+
+def _warm_worker():
+    # pandas + prophet(cmdstan) import는 워커 기동 시 한 번만
+    import pandas  # noqa: F401
+    import prophet  # noqa: F401
+
+def fit_prophet(records: List[dict], periods: int) -> List[dict]:
+    import pandas as pd
+    from prophet import Prophet
+    df = pd.DataFrame(records)
+    df["ds"] = pd.to_datetime(df["ds"])
+    m = Prophet()
+    m.fit(df)
+    future = m.make_future_dataframe(periods=periods)
+    fc = m.predict(future)
+    recent = fc[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(periods)
+    return [
+        {
+            "ds": row["ds"].to_pydatetime(),
+            "yhat": float(row["yhat"]),
+            "yhat_lower": float(row["yhat_lower"]),
+            "yhat_upper": float(row["yhat_upper"]),
+        }
+        for _, row in recent.iterrows()
+    ]
+
+def _timed_call(fn, args):
+    """자식에서 실제 실행이 시작된 시각을 함께 돌려줘 대기 시간을 잴 수 있게 한다"""
+    return time.time(), fn(*args)
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class WorkerCrashed(Exception):
+    """워커 프로세스가 비정상 종료(segfault, OOM kill 등)됨. 풀은 새로 만들어 두었으므로 재시도 가능"""
+
+
+class ForecastPool:
+    """워커 수 + max_queue 를 넘는 요청은 바로 거절(PoolSaturated)하고, 요청별 timeout을 건다.
+
+    timeout이 나도 자식 프로세스의 작업은 취소되지 않으므로, 점유 수(inflight)는 작업이 실제로
+    끝날 때 줄인다 → 느린 작업이 쌓이면 새 요청을 받지 않는다.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 4, timeout: float = 30.0):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self._executor = self._make_executor()
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def _make_executor(self) -> ProcessPoolExecutor:
+        # uvicorn 프로세스는 스레드를 쓰므로 fork 대신 spawn
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    def _replace_broken(self, executor: ProcessPoolExecutor):
+        """워커가 죽으면 ProcessPoolExecutor는 계속 BrokenProcessPool 상태이므로 새 풀로 교체 (한 번만)"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._make_executor()
+        metrics.inc("forecast_pool.restarts")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def is_busy(self) -> bool:
+        """대기 없이 바로 실행할 워커가 없으면 True"""
+        return self._inflight >= self.max_workers
+
+    def _update_gauges(self):
+        metrics.set_gauge("forecast_pool.inflight", self._inflight)
+        metrics.set_gauge("forecast_pool.utilization", min(self._inflight, self.max_workers) / self.max_workers)
+        metrics.set_gauge("forecast_pool.queue_depth", max(0, self._inflight - self.max_workers))
+
+    def _release(self, _future):
+        with self._lock:
+            self._inflight -= 1
+            self._update_gauges()
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._inflight >= self.max_workers + self.max_queue:
+                metrics.inc("forecast_pool.rejected")
+                raise PoolSaturated()
+            self._inflight += 1
+            self._update_gauges()
+        submitted = time.time()
+        executor = self._executor
+        try:
+            future = executor.submit(_timed_call, fn, args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._replace_broken(executor)
+            raise WorkerCrashed()
+        future.add_done_callback(self._release)
+        try:
+            started, result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            metrics.inc("forecast_pool.timeouts")
+            raise
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            raise WorkerCrashed()
+        metrics.observe("forecast_pool.queue_wait_ms", max(0.0, started - submitted) * 1000)
+        metrics.observe("forecast_pool.run_ms", (time.time() - started) * 1000)
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
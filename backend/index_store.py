@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from backend import metrics
+from backend.logging_module import logger
+from backend.meta_store import MetaStore
+from backend.tags import tag_vocabulary, encode_policy_tags, build_postings
+
+# ────────────── 버전별 정책 인덱스 + 무중단 교체 ──────────────
+# data/index_versions/<버전>/ 아래에 인덱스·메타·임베딩이 함께 들어 있고,
+# data/index_versions/CURRENT 파일이 현재 버전 이름을 가리킨다 (scripts/build_index.py가 원자적으로 교체).
+VERSIONS_DIRNAME = "index_versions"
+CURRENT_FILENAME = "CURRENT"
+INDEX_FILENAME = "policy_index.faiss"
+META_FILENAME = "policy_meta.json"
+META_STORE_DIRNAME = "policy_meta"
+EMBEDDINGS_FILENAME = "policy_embeddings.npy"
+INDEX_META_FILENAME = "policy_index_meta.json"
+TAG_BITS_FILENAME = "tag_bits.npy"
+TAG_VOCAB_FILENAME = "tags.json"
+
+def apply_search_params(index, params: dict):
+    """검색 시점 파라미터(nprobe/efSearch) 적용"""
+    import faiss
+    space = faiss.ParameterSpace()
+    for name in ("nprobe", "efSearch"):
+        if name in params:
+            space.set_index_parameter(index, name, params[name])
+
+def load_index(path: str, index_meta: dict):
+    """인덱스 메타에 선언된 타입(flat/ivf_flat/hnsw/ivf_pq)의 검색 파라미터까지 적용해서 로드.
+
+    가능하면 mmap으로 열어 같은 버전을 쓰는 워커들이 페이지 캐시를 공유하게 한다.
+    IO_FLAG_MMAP은 IVF 역리스트에만 적용되고 Flat/HNSW 벡터 저장소는 그대로 메모리로 복사하므로,
+    Flat/HNSW는 저장소까지 파일에서 바로 참조하는 IO_FLAG_MMAP_IFC로 연다.
+    """
+    import faiss
+    index_path = os.path.join(path, INDEX_FILENAME)
+    if index_meta.get("type", "flat") in ("ivf_flat", "ivf_pq"):
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    elif hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        flags = faiss.IO_FLAG_MMAP_IFC
+    else:
+        logger.warning("설치된 faiss에 IO_FLAG_MMAP_IFC가 없어 Flat/HNSW 인덱스가 워커마다 메모리로 복사됨")
+        flags = 0
+    try:
+        index = faiss.read_index(index_path, flags)
+    except RuntimeError as e:
+        # 인덱스 타입/faiss 버전에 따라 mmap 미지원
+        logger.warning(f"faiss mmap 로드 실패, 일반 로드로 대체: {e}")
+        index = faiss.read_index(index_path)
+    apply_search_params(index, index_meta.get("params", {}))
+    return index
+
+def load_meta(path: str):
+    store_path = os.path.join(path, META_STORE_DIRNAME)
+    if os.path.isdir(store_path):
+        return MetaStore(store_path)
+    with open(os.path.join(path, META_FILENAME), encoding="utf-8") as f:
+        return json.load(f)
+
+def search_params(index_meta: dict, allowed_ids: np.ndarray):
+    """allowed_ids 안에서만 검색하도록 인덱스 타입에 맞는 SearchParameters 생성.
+
+    SearchParameters를 넘기면 인덱스에 설정된 nprobe/efSearch 대신 이 값이 쓰이므로 함께 지정한다.
+    """
+    import faiss
+    ids = np.ascontiguousarray(allowed_ids, dtype="int64")
+    selector = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+    index_type = index_meta.get("type", "flat")
+    params = index_meta.get("params", {})
+    if index_type in ("ivf_flat", "ivf_pq"):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=params.get("nprobe", 1))
+    if index_type == "hnsw":
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=params.get("efSearch", 16))
+    return faiss.SearchParameters(sel=selector)
+
+def load_tags(path: str, meta):
+    """(태그 어휘, 정책별 태그 비트마스크). 빌드 시 만들어 두지 않은 구버전이면 메타에서 계산"""
+    bits_path = os.path.join(path, TAG_BITS_FILENAME)
+    vocab_path = os.path.join(path, TAG_VOCAB_FILENAME)
+    if os.path.exists(bits_path) and os.path.exists(vocab_path):
+        with open(vocab_path, encoding="utf-8") as f:
+            vocab = json.load(f)
+        return vocab, np.load(bits_path, mmap_mode="r")
+    vocab = tag_vocabulary()
+    return vocab, encode_policy_tags([meta[i].get("trgterIndvdlArray", "") for i in range(len(meta))], vocab)
+
+def load_snapshot(path: str, version: str) -> dict:
+    meta = load_meta(path)
+    tag_vocab, tag_bits = load_tags(path, meta)
+    index_meta = {}
+    index_meta_path = os.path.join(path, INDEX_META_FILENAME)
+    if os.path.exists(index_meta_path):
+        with open(index_meta_path, encoding="utf-8") as f:
+            index_meta = json.load(f)
+    return {
+        "index": load_index(path, index_meta),
+        "meta": meta,
+        "tag_vocab": tag_vocab,
+        "tag_bits": tag_bits,
+        "tag_postings": build_postings(tag_bits, tag_vocab),
+        # 검색에는 쓰지 않으므로 mmap으로만 열어둔다 (접근 전까지 RSS 0)
+        "embeddings": np.load(os.path.join(path, EMBEDDINGS_FILENAME), mmap_mode="r"),
+        "index_meta": index_meta,
+        "version": version,
+    }
+
+
+class PolicyIndexStore:
+    """현재 인덱스 스냅샷을 들고 있다가 CURRENT가 바뀌면 백그라운드에서 새 버전을 로드해 교체.
+
+    스냅샷은 교체만 되고 수정되지 않으므로, 검색 시작 시 snapshot()으로 받은 참조를 끝까지 쓰면
+    진행 중인 검색은 이전 버전으로 끝난다.
+    """
+
+    def __init__(self, data_dir: str, check_interval: float = 30.0):
+        self.data_dir = data_dir
+        self.versions_dir = os.path.join(data_dir, VERSIONS_DIRNAME)
+        self.check_interval = check_interval
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._snapshot = self._load(self.read_current())
+
+    def read_current(self):
+        """CURRENT가 가리키는 버전 이름 (버전 디렉터리가 없으면 None → data/ 바로 아래 구버전 파일)"""
+        try:
+            with open(os.path.join(self.versions_dir, CURRENT_FILENAME), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _load(self, version):
+        if version is None:
+            path = self.data_dir
+            version = "legacy-" + str(int(os.path.getmtime(os.path.join(path, INDEX_FILENAME))))
+        else:
+            path = os.path.join(self.versions_dir, version)
+        started = time.perf_counter()
+        snapshot = load_snapshot(path, version)
+        metrics.observe("policy_index.load_seconds", time.perf_counter() - started)
+        metrics.set_gauge("policy_index.version", version)
+        metrics.set_gauge("policy_index.count", int(snapshot["index"].ntotal))
+        metrics.set_gauge("policy_index.type", snapshot["index_meta"].get("type", "flat"))
+        return snapshot
+
+    def _reload(self, version):
+        try:
+            self._snapshot = self._load(version)
+            metrics.inc("policy_index.reloads")
+            logger.info(f"policy index 교체 완료 → {version}")
+        except Exception as e:
+            metrics.inc("policy_index.reload_errors")
+            logger.error(f"policy index {version} 로드 실패, 기존 버전 유지: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        version = self.read_current()
+        if version is None or version == self._snapshot["version"]:
+            return
+        if self._reload_lock.acquire(blocking=False):
+            threading.Thread(target=self._reload, args=(version,), name="policy-index-reload", daemon=True).start()
+
+    def snapshot(self) -> dict:
+        self.maybe_reload()
+        return self._snapshot
@@ -1,3 +1,4 @@
+import json
 import logging
 
 logger = logging.getLogger("nextstep")
@@ -6,3 +7,8 @@ handler = logging.StreamHandler()
 formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
 handler.setFormatter(formatter)
 logger.addHandler(handler)
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """구조화 로그: 한 줄 JSON {"event": ..., **fields}"""
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps({"event": event, **fields}, ensure_ascii=False, default=str))
@@ -0,0 +1,59 @@
+import json
+import os
+from typing import List
+import numpy as np
+
+# ────────────── 정책 메타데이터 컬럼형 저장소 ──────────────
+# 필드마다 <field>.bin(UTF-8 문자열을 이어붙인 바이트)과 <field>.idx.npy(행별 시작 오프셋, n+1개)를 둔다.
+# 읽을 때는 둘 다 mmap으로 열기 때문에 워커 수와 관계없이 페이지 캐시 한 벌만 쓰고,
+# 행 번호로 필요한 행만 디코딩한다 (정책별 dict를 미리 만들지 않음).
+FIELDS = ["servId", "policy_name", "url", "trgterIndvdlArray"]
+HEADER_FILENAME = "meta_store.json"
+
+def write_meta_store(records: List[dict], path: str, fields: List[str] = FIELDS):
+    os.makedirs(path, exist_ok=True)
+    for field in fields:
+        encoded = [str(record.get(field, "") or "").encode("utf-8") for record in records]
+        offsets = np.zeros(len(encoded) + 1, dtype="uint64")
+        offsets[1:] = np.cumsum([len(b) for b in encoded], dtype="uint64")
+        with open(os.path.join(path, f"{field}.bin"), "wb") as f:
+            for b in encoded:
+                f.write(b)
+        np.save(os.path.join(path, f"{field}.idx.npy"), offsets)
+    with open(os.path.join(path, HEADER_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({"fields": fields, "count": len(records)}, f, ensure_ascii=False)
+
+
+class MetaStore:
+    """행 번호로 조회하는 읽기 전용 메타데이터. store[i]는 기존 policy_meta.json 항목과 같은 dict"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, HEADER_FILENAME), encoding="utf-8") as f:
+            header = json.load(f)
+        self.fields = header["fields"]
+        self.count = header["count"]
+        self._offsets = {}
+        self._blobs = {}
+        for field in self.fields:
+            self._offsets[field] = np.load(os.path.join(path, f"{field}.idx.npy"), mmap_mode="r")
+            blob_path = os.path.join(path, f"{field}.bin")
+            # 길이 0 파일은 mmap할 수 없음
+            if os.path.getsize(blob_path):
+                self._blobs[field] = np.memmap(blob_path, dtype="uint8", mode="r")
+            else:
+                self._blobs[field] = np.zeros(0, dtype="uint8")
+
+    def __len__(self):
+        return self.count
+
+    def column(self, field: str, i: int) -> str:
+        offsets = self._offsets[field]
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        return self._blobs[field][start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return {field: self.column(field, i) for field in self.fields}
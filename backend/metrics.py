@@ -0,0 +1,42 @@
+import threading
+from fastapi import APIRouter
+
+# ────────────── 프로세스 내 간단한 메트릭 저장소 ──────────────
+# 워커 프로세스 단위로 집계되며 /metrics 에서 JSON으로 조회한다 (관리자 전용, app.py에서 require_admin 적용).
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_summaries = {}
+
+router = APIRouter(tags=["metrics"])
+
+def inc(name: str, value: float = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def set_gauge(name: str, value):
+    with _lock:
+        _gauges[name] = value
+
+def observe(name: str, value: float):
+    """count/sum/min/max 누적 (평균은 sum/count)"""
+    with _lock:
+        s = _summaries.get(name)
+        if s is None:
+            s = _summaries[name] = {"count": 0, "sum": 0.0, "min": value, "max": value}
+        s["count"] += 1
+        s["sum"] += value
+        s["min"] = min(s["min"], value)
+        s["max"] = max(s["max"], value)
+
+def snapshot() -> dict:
+    with _lock:
+        summaries = {
+            name: {**s, "avg": s["sum"] / s["count"] if s["count"] else 0.0}
+            for name, s in _summaries.items()
+        }
+        return {"counters": dict(_counters), "gauges": dict(_gauges), "summaries": summaries}
+
+@router.get("/metrics")
+async def get_metrics():
+    return snapshot()
@@ -0,0 +1,78 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from typing import List
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from backend.database import AsyncSessionLocal
+
+# ────────────── keyset 페이지네이션 커서 + 스트리밍 export ──────────────
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def make_naive(dt: datetime) -> datetime:
+    """timezone-aware datetime을 naive(타임존 없는)로 변환 (DateTime 컬럼은 타임존 없음)"""
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(tz=None).replace(tzinfo=None)
+    return dt
+
+def encode_cursor(*values) -> str:
+    """마지막 행의 정렬 키 → 불투명 커서 문자열"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+def decode_timestamp_cursor(cursor: str):
+    """(timestamp, id) 커서"""
+    values = decode_cursor(cursor)
+    try:
+        return make_naive(datetime.fromisoformat(values[0])), int(values[1])
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+def decode_id_cursor(cursor: str) -> int:
+    """(id,) 커서"""
+    values = decode_cursor(cursor)
+    try:
+        return int(values[0])
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+def export_response(stmt, columns: List[str], fmt: str, filename: str) -> StreamingResponse:
+    """서버 사이드 커서로 EXPORT_BATCH_SIZE씩 읽어 바로 내보낸다 → 전체 이력도 메모리 사용량 일정.
+
+    응답을 보내는 동안 세션이 살아 있어야 하므로 요청 의존성(get_db) 대신 제너레이터 안에서 세션을 연다.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format은 {', '.join(EXPORT_FORMATS)} 중 하나여야 합니다.")
+
+    async def rows():
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            if fmt == "csv":
+                yield ",".join(columns) + "\n"
+            async for partition in result.partitions(EXPORT_BATCH_SIZE):
+                buf = io.StringIO()
+                writer = csv.writer(buf) if fmt == "csv" else None
+                for row in partition:
+                    values = jsonable_encoder([getattr(row, c) for c in columns])
+                    if writer is not None:
+                        writer.writerow(values)
+                    else:
+                        buf.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n")
+                yield buf.getvalue()
+
+    return StreamingResponse(
+        rows(),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend import metrics
+
+# ────────────── bcrypt 해시/검증 전용 스레드 풀 ──────────────
+# bcrypt는 해시 계산 중 GIL을 놓으므로 스레드로도 이벤트 루프를 막지 않고 병렬 실행된다.
+
+class HashQueueTimeout(Exception):
+    pass
+
+class PasswordHasher:
+    """동시 실행은 max_workers개로 제한, 자리가 나기를 queue_timeout초 넘게 기다린 요청은 HashQueueTimeout.
+
+    로그인 폭주가 와도 CPU를 max_workers개 코어 이상 쓰지 않고, 나머지 엔드포인트는 계속 응답한다.
+    """
+
+    def __init__(self, max_workers: int = 2, queue_timeout: float = 2.0):
+        self.max_workers = max(1, max_workers)
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def _set_waiting(self, delta: int):
+        with self._lock:
+            self._waiting += delta
+            metrics.set_gauge("password_hash.queue_depth", self._waiting)
+
+    async def run(self, fn, *args):
+        self._set_waiting(1)
+        submitted = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.inc("password_hash.rejected")
+            raise HashQueueTimeout()
+        finally:
+            self._set_waiting(-1)
+        try:
+            started = time.perf_counter()
+            metrics.observe("password_hash.queue_wait_ms", (started - submitted) * 1000)
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+            metrics.observe("password_hash.run_ms", (time.perf_counter() - started) * 1000)
+            return result
+        finally:
+            self._semaphore.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,62 +1,132 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from typing import List
-from backend.auth import get_current_user, User
-from backend.schemas import PolicyRecommendationOut
+from backend.auth import get_current_principal
+from backend.schemas import PolicyRecommendationOut, Principal
 import numpy as np
-import faiss
-import json
-from transformers import AutoTokenizer, AutoModel
-import torch
+from backend import subsystems
+from backend.index_store import PolicyIndexStore, search_params
+from backend.encoder import load_encoder, MODEL_ID
+from backend import metrics
 from backend.query_expansion import query_expand
-
-torch.set_num_threads(1)
-torch.set_num_interop_threads(1)
-
-tokenizer = AutoTokenizer.from_pretrained("monologg/kobert", trust_remote_code=True)
-model = AutoModel.from_pretrained("monologg/kobert", trust_remote_code=True)
-model.eval()
+from backend.query_encoder import MicroBatchEncoder
+from backend.cache import make_cache
+from backend.tags import unpack_tags, query_tag_vector
+from backend.config import (
+    ENCODER_MAX_BATCH_SIZE, ENCODER_MAX_WAIT_MS, CACHE_REDIS_URL,
+    RECOMMEND_CACHE_BACKEND, RECOMMEND_CACHE_SIZE, RECOMMEND_CACHE_TTL, INDEX_RELOAD_INTERVAL,
+    RERANK_SIM_WEIGHT, RERANK_TAG_WEIGHT, RECOMMEND_FILTERED_SEARCH, RECOMMEND_FILTER_MIN_SIZE,
+    ENCODER_BACKEND, ENCODER_ONNX_PATH,
+)
 
 DATA_DIR = "data"
-EMBEDDINGS_FILE = f"{DATA_DIR}/policy_embeddings.npy"
-INDEX_FILE = f"{DATA_DIR}/policy_index.faiss"
-META_FILE = f"{DATA_DIR}/policy_meta.json"
 
-policy_embeddings = np.load(EMBEDDINGS_FILE)
-policy_index = faiss.read_index(INDEX_FILE)
-with open(META_FILE, encoding="utf-8") as f:
-    policy_meta = json.load(f)
+# torch/transformers/faiss는 무거우므로 실제로 필요할 때(subsystems.get) import 한다.
+def load_query_encoder():
+    return load_encoder(ENCODER_BACKEND, onnx_path=ENCODER_ONNX_PATH)
+
+subsystems.register("policy_encoder", load_query_encoder)
+subsystems.register("policy_index", lambda: PolicyIndexStore(DATA_DIR, check_interval=INDEX_RELOAD_INTERVAL))
 
 router = APIRouter()
 
+# 쿼리 임베딩은 인덱스와 무관하고, 추천 결과는 인덱스 버전이 키에 들어가므로 새 버전 교체 시 자동 무효화
+embedding_cache = make_cache("query_embedding", RECOMMEND_CACHE_BACKEND, RECOMMEND_CACHE_SIZE, RECOMMEND_CACHE_TTL, CACHE_REDIS_URL)
+recommend_cache = make_cache("recommend", RECOMMEND_CACHE_BACKEND, RECOMMEND_CACHE_SIZE, RECOMMEND_CACHE_TTL, CACHE_REDIS_URL)
+
+def embed_texts_with_expansion(texts: List[str]) -> np.ndarray:
+    """여러 쿼리를 가장 긴 쿼리 길이까지만 패딩해서 한 번에 임베딩 → (len(texts), dim)"""
+    texts_full = [text + " " + " ".join(query_expand(text)) for text in texts]
+    return subsystems.get("policy_encoder").encode(texts_full)
+
 def embed_text_with_expansion(text: str) -> np.ndarray:
-    expanded_tags = query_expand(text)
-    text_full = text + " " + " ".join(expanded_tags)
-    inputs = tokenizer(text_full, return_tensors="pt", truncation=True, max_length=512)
-    with torch.no_grad():
-        out = model(**inputs).last_hidden_state.mean(dim=1).squeeze().numpy()
-        out = out / (np.linalg.norm(out) + 1e-10)
-    return out.reshape(1, -1).astype("float32")
-
-def search_similar_policies(query_embedding: np.ndarray, top_k: int = 5):
-    D, I = policy_index.search(query_embedding, top_k)
-    return I[0].tolist()
-
-def rerank_with_tags(results, query_tags):
-    def score(policy):
-        policy_tags = policy.get("trgterIndvdlArray", "")
-        s = sum([1 for tag in query_tags if tag in policy_tags])
-        return s
-    return sorted(results, key=lambda p: score(p), reverse=True)
+    return embed_texts_with_expansion([text])
+
+query_encoder = MicroBatchEncoder(
+    embed_texts_with_expansion,
+    max_batch_size=ENCODER_MAX_BATCH_SIZE,
+    max_wait_ms=ENCODER_MAX_WAIT_MS,
+)
+
+@router.on_event("shutdown")
+async def close_query_encoder():
+    await query_encoder.close()
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+async def get_query_embedding(normalized: str, tag_key: str) -> np.ndarray:
+    key = f"{MODEL_ID}:{ENCODER_BACKEND}|{tag_key}|{normalized}"
+    query_vec = embedding_cache.get(key)
+    if query_vec is None:
+        query_vec = await query_encoder.encode(normalized)
+        embedding_cache.set(key, query_vec)
+    return query_vec
+
+def search_similar_policies(query_embedding: np.ndarray, top_k: int = 5, snapshot: dict = None, allowed_ids: np.ndarray = None):
+    snapshot = snapshot or subsystems.get("policy_index").snapshot()
+    if allowed_ids is None:
+        D, I = snapshot["index"].search(query_embedding, top_k)
+    else:
+        D, I = snapshot["index"].search(query_embedding, top_k, params=search_params(snapshot["index_meta"], allowed_ids))
+    found = I[0] >= 0  # 인덱스 크기보다 top_k가 크면 -1로 채워짐
+    return D[0][found], I[0][found]
+
+def tag_filter_ids(query_tags, snapshot: dict):
+    """쿼리 태그 중 하나라도 가진 정책 행 번호 (posting list 합집합). 태그가 없으면 None"""
+    postings = [snapshot["tag_postings"][tag] for tag in query_tags if tag in snapshot["tag_postings"]]
+    if not postings:
+        return None
+    return np.unique(np.concatenate(postings))
+
+def search_candidates(query_vec: np.ndarray, query_tags, top_k: int, snapshot: dict):
+    """태그 필터 검색을 우선 시도하고, 필터 대상이 너무 적거나 결과가 모자라면 전체 검색(top_k*2)으로 대체"""
+    if RECOMMEND_FILTERED_SEARCH:
+        allowed = tag_filter_ids(query_tags, snapshot)
+        if allowed is not None and len(allowed) >= max(top_k, RECOMMEND_FILTER_MIN_SIZE):
+            scores, indices = search_similar_policies(query_vec, top_k=top_k, snapshot=snapshot, allowed_ids=allowed)
+            if len(indices) >= top_k:
+                metrics.inc("policy_search.filtered")
+                return scores, indices
+        if allowed is not None:
+            metrics.inc("policy_search.filter_fallback")
+    metrics.inc("policy_search.unfiltered")
+    return search_similar_policies(query_vec, top_k=top_k*2, snapshot=snapshot)
+
+def rerank_with_tags(scores: np.ndarray, indices: np.ndarray, query_tags, snapshot: dict):
+    """후보 전체를 한 번에 점수화: 코사인 유사도와 태그 일치도의 가중합 → (행 번호, 점수) 내림차순"""
+    vocab = snapshot["tag_vocab"]
+    tag_score = np.zeros(len(indices), dtype="float32")
+    if query_tags and len(indices):
+        membership = unpack_tags(np.asarray(snapshot["tag_bits"][indices]), len(vocab))
+        tag_score = membership @ query_tag_vector(query_tags, vocab) / len(query_tags)
+    fused = RERANK_SIM_WEIGHT * scores + RERANK_TAG_WEIGHT * tag_score
+    order = np.argsort(-fused, kind="stable")
+    return indices[order], fused[order]
 
 @router.get("/recommend", response_model=List[PolicyRecommendationOut])
 async def recommend_policies(
+    response: Response,
     query: str = Query(..., description="정책 추천을 위한 사용자 자연어/상황"),
     top_k: int = Query(5, description="추천 정책 개수"),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    query_tags = query_expand(query)
-    query_vec = embed_text_with_expansion(query)
-    indices = search_similar_policies(query_vec, top_k=top_k*2)
-    results = [policy_meta[i] for i in indices]
-    results_reranked = rerank_with_tags(results, query_tags)
-    return results_reranked[:top_k]
+    normalized = normalize_query(query)
+    query_tags = query_expand(normalized)
+    tag_key = ",".join(sorted(query_tags))
+    # 요청 처리 중 인덱스가 교체돼도 이 스냅샷으로 끝까지 검색
+    snapshot = (await subsystems.aget("policy_index")).snapshot()
+    response.headers["X-Policy-Index-Version"] = snapshot["version"]
+    result_key = f"{snapshot['version']}|{top_k}|{tag_key}|{normalized}"
+    cached = recommend_cache.get(result_key)
+    if cached is not None:
+        return cached
+
+    query_vec = await get_query_embedding(normalized, tag_key)
+    scores, indices = search_candidates(query_vec, query_tags, top_k, snapshot)
+    rows, fused = rerank_with_tags(scores, indices, query_tags, snapshot)
+    results = [
+        {**snapshot["meta"][int(i)], "score": float(s)}
+        for i, s in zip(rows[:top_k], fused[:top_k])
+    ]
+    recommend_cache.set(result_key, results)
+    return results
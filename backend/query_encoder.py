@@ -0,0 +1,77 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+import numpy as np
+from backend import metrics
+
+class MicroBatchEncoder:
+    """동시에 들어온 쿼리를 잠깐(max_wait_ms) 모았다가 한 번의 배치 forward로 임베딩.
+
+    모델 연산은 전용 스레드에서 실행되므로 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-encoder")
+        self._queue = None
+        self._worker = None
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def encode(self, text: str) -> np.ndarray:
+        """(1, dim) float32 벡터 반환"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, time.perf_counter()))
+        metrics.set_gauge("query_encoder.queue_depth", self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [item for item in batch if not item[1].done()]  # 취소된 요청 제외
+            if not batch:
+                continue
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                metrics.observe("query_encoder.queue_wait_ms", (started - enqueued) * 1000)
+            metrics.observe("query_encoder.batch_size", len(batch))
+            metrics.set_gauge("query_encoder.queue_depth", self._queue.qsize())
+            try:
+                vecs = await loop.run_in_executor(self._executor, self.encode_fn, [text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            metrics.observe("query_encoder.forward_ms", (time.perf_counter() - started) * 1000)
+            for i, (_, future, _) in enumerate(batch):
+                if not future.done():
+                    future.set_result(vecs[i:i + 1].copy())  # 뷰는 배치 전체를 붙잡으므로 복사 (결과가 캐시에 오래 남음)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._executor.shutdown(wait=False)
@@ -1,23 +1,21 @@
 # query_expansion.py
+import json
+import os
 from typing import List
+from backend.text_matcher import KeywordMatcher
 
-QUERY_EXPANSION_DICT = {
-    "배달": ["플랫폼 노동자", "비정규직", "저소득층"],
-    "알바": ["비정규직", "청년"],
-    "프리랜서": ["비정규직", "플랫폼 노동자"],
-    "임산부": ["임산부", "여성"],
-    "청년": ["청년"],
-    "중장년": ["중장년"],
-    "노인": ["노년", "노인"],
-    "장애": ["장애인"],
-    "독거": ["1인가구", "저소득층"],
-    # 필요한 만큼 추가 확장
-}
+VOCAB_DIR = os.path.join(os.path.dirname(__file__), "vocab")
+QUERY_EXPANSION_FILE = os.path.join(VOCAB_DIR, "query_expansion.json")
+
+# 키워드 → 확장 태그. 어휘는 vocab/query_expansion.json에서 관리
+with open(QUERY_EXPANSION_FILE, encoding="utf-8") as f:
+    QUERY_EXPANSION_DICT = json.load(f)
+
+_matcher = KeywordMatcher(QUERY_EXPANSION_DICT)
 
 def query_expand(user_text: str) -> List[str]:
     user_text = user_text.lower()
     tags = set()
-    for k, v in QUERY_EXPANSION_DICT.items():
-        if k in user_text:
-            tags.update(v)
+    for k in _matcher.find(user_text):
+        tags.update(QUERY_EXPANSION_DICT[k])
     return list(tags)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Optional, List, Any
+from backend.config import FORECAST_MAX_PERIODS
 
 class UserBase(BaseModel):
     username: str
@@ -18,6 +19,18 @@ class UserOut(BaseModel):
     class Config:
         orm_mode = True
 
+class Principal(BaseModel):
+    """인증된 사용자 요약 (principal 캐시에 저장). id만 필요한 라우트는 DB 조회 없이 이것만 사용"""
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    token_version: int = 0
+    is_admin: bool = False
+
+    class Config:
+        orm_mode = True
+
 class SpendingRecordBase(BaseModel):
     date: datetime
     amount: float
@@ -32,13 +45,32 @@ class SpendingRecordOut(SpendingRecordBase):
     class Config:
         orm_mode = True
 
+class SpendingCategorySummary(BaseModel):
+    category: Optional[str]
+    total: float
+    count: int
+
+class SpendingPeriodSummary(BaseModel):
+    period: datetime   # 구간 시작 (day/week/month 단위로 절삭)
+    total: float
+    count: int
+
 class ForecastRequestItem(BaseModel):
     ds: datetime
     y: float
 
 class ForecastRequestSchema(BaseModel):
     data: List[ForecastRequestItem]
-    periods: int
+    periods: int = Field(..., ge=1, le=FORECAST_MAX_PERIODS)
+    engine: str = "prophet"  # "prophet" | "fast"(벡터화 경량 엔진) | "auto"(Prophet 풀이 바쁘면 fast)
+
+class ForecastSeries(BaseModel):
+    id: Optional[str] = None
+    data: List[ForecastRequestItem]
+
+class ForecastBatchRequestSchema(BaseModel):
+    series: List[ForecastSeries]
+    periods: int = Field(..., ge=1, le=FORECAST_MAX_PERIODS)
 
 class ForecastResponseItem(BaseModel):
     ds: datetime
@@ -46,6 +78,10 @@ class ForecastResponseItem(BaseModel):
     yhat_lower: float
     yhat_upper: float
 
+class ForecastBatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    forecast: List[ForecastResponseItem]
+
 class ForecastLogCreate(BaseModel):
     request_data: str
     response_data: Any
@@ -61,7 +97,7 @@ class PolicyRecommendationOut(BaseModel):
     policy_name: str
     servId: str
     url: str
-    # 필요하면 score(유사도)도 추가 가능
+    score: Optional[float] = None  # 코사인 유사도 + 태그 일치도 가중합
 
 
 class RecommendLog(BaseModel):
@@ -104,6 +140,19 @@ class TransactionOut(TransactionBase):
     class Config:
         orm_mode = True
 
+class TransactionBulkCreate(BaseModel):
+    transactions: List[TransactionCreate]
+
+class TransactionBulkResultItem(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class TransactionBulkOut(BaseModel):
+    inserted: int
+    failed: int
+    results: List[TransactionBulkResultItem]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -1,20 +1,35 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from backend.database import get_db, SpendingRecord
-from backend.schemas import SpendingRecordCreate, SpendingRecordOut
-from backend.auth import get_current_user
+from backend.schemas import SpendingRecordCreate, SpendingRecordOut, SpendingCategorySummary, SpendingPeriodSummary
+from backend.auth import get_current_principal
+from backend.pagination import make_naive
 
 router = APIRouter(prefix="/spending", tags=["spending"])
 
+def in_range(stmt, user_id: int, start: Optional[datetime], end: Optional[datetime]):
+    """user_id + 기간 조건 ((user_id, date) 복합 인덱스 사용). end는 포함하지 않음"""
+    # ?start=...Z 처럼 타임존이 붙은 값은 naive 컬럼과 비교할 수 없으므로 변환
+    start, end = make_naive(start), make_naive(end)
+    stmt = stmt.where(SpendingRecord.user_id == user_id)
+    if start is not None:
+        stmt = stmt.where(SpendingRecord.date >= start)
+    if end is not None:
+        stmt = stmt.where(SpendingRecord.date < end)
+    return stmt
+
 @router.post("/", response_model=SpendingRecordOut)
 async def create_spending(
     record: SpendingRecordCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_principal)
 ):
     db_record = SpendingRecord(
-        date=record.date,
+        date=make_naive(record.date),
         amount=record.amount,
         category=record.category,
         user_id=current_user.id,
@@ -26,10 +41,48 @@ async def create_spending(
 
 @router.get("/", response_model=list[SpendingRecordOut])
 async def get_spending(
+    start: Optional[datetime] = Query(None, description="조회 시작 시각 (포함)"),
+    end: Optional[datetime] = Query(None, description="조회 종료 시각 (미포함)"),
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_principal)
 ):
     result = await db.execute(
-        select(SpendingRecord).where(SpendingRecord.user_id == current_user.id)
+        in_range(select(SpendingRecord), current_user.id, start, end).order_by(SpendingRecord.date)
     )
     return result.scalars().all()
+
+@router.get("/summary/category", response_model=list[SpendingCategorySummary], summary="카테고리별 지출 합계")
+async def summary_by_category(
+    start: Optional[datetime] = Query(None, description="집계 시작 시각 (포함)"),
+    end: Optional[datetime] = Query(None, description="집계 종료 시각 (미포함)"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_principal)
+):
+    stmt = in_range(
+        select(SpendingRecord.category, func.sum(SpendingRecord.amount), func.count(SpendingRecord.id)),
+        current_user.id, start, end,
+    ).group_by(SpendingRecord.category).order_by(func.sum(SpendingRecord.amount).desc())
+    result = await db.execute(stmt)
+    return [
+        SpendingCategorySummary(category=category, total=float(total or 0.0), count=count)
+        for category, total, count in result.all()
+    ]
+
+@router.get("/summary/period", response_model=list[SpendingPeriodSummary], summary="기간(일/주/월)별 지출 합계")
+async def summary_by_period(
+    granularity: str = Query("month", regex="^(day|week|month)$", description="day | week | month"),
+    start: Optional[datetime] = Query(None, description="집계 시작 시각 (포함)"),
+    end: Optional[datetime] = Query(None, description="집계 종료 시각 (미포함)"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_principal)
+):
+    period = func.date_trunc(granularity, SpendingRecord.date).label("period")
+    stmt = in_range(
+        select(period, func.sum(SpendingRecord.amount), func.count(SpendingRecord.id)),
+        current_user.id, start, end,
+    ).group_by(period).order_by(period)
+    result = await db.execute(stmt)
+    return [
+        SpendingPeriodSummary(period=p, total=float(total or 0.0), count=count)
+        for p, total, count in result.all()
+    ]
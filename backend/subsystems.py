@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Iterable
+from backend import metrics
+from backend.logging_module import logger
+
+# ────────────── 무거운 서브시스템(모델/인덱스 등) 지연 로딩 ──────────────
+# register()로 로더만 등록해 두고, 처음 get() 할 때(또는 백그라운드 warm-up 시) 로드한다.
+_loaders = {}
+_values = {}
+_status = {}
+_lock = threading.Lock()
+_load_locks = {}
+
+def register(name: str, loader: Callable):
+    with _lock:
+        _loaders[name] = loader
+        _load_locks.setdefault(name, threading.Lock())
+        _status.setdefault(name, {"loaded": False})
+
+def is_loaded(name: str) -> bool:
+    return name in _values
+
+def get(name: str):
+    if name in _values:
+        return _values[name]
+    with _load_locks[name]:
+        if name not in _values:
+            started = time.perf_counter()
+            try:
+                value = _loaders[name]()
+            except Exception as e:
+                _status[name] = {"loaded": False, "error": str(e)}
+                logger.error(f"subsystem {name} 로드 실패: {e}")
+                raise
+            elapsed = time.perf_counter() - started
+            _values[name] = value
+            _status[name] = {"loaded": True, "load_seconds": round(elapsed, 3)}
+            metrics.set_gauge(f"subsystem.{name}.load_seconds", elapsed)
+            logger.info(f"subsystem {name} 로드 완료 ({elapsed:.1f}s)")
+    return _values[name]
+
+async def aget(name: str):
+    """이벤트 루프를 막지 않도록 아직 로드되지 않았으면 스레드에서 로드"""
+    if name in _values:
+        return _values[name]
+    return await asyncio.get_running_loop().run_in_executor(None, get, name)
+
+def reset(name: str):
+    """다음 get()에서 다시 로드하도록 캐시된 값을 버린다"""
+    with _load_locks[name]:
+        _values.pop(name, None)
+        _status[name] = {"loaded": False}
+
+def status() -> dict:
+    with _lock:
+        return {name: dict(_status[name]) for name in _loaders}
+
+def warm_up(names: Iterable[str]):
+    """서버가 요청을 받기 시작한 뒤 백그라운드 스레드에서 순서대로 로드"""
+    targets = [name for name in names if name in _loaders]
+
+    def run():
+        for name in targets:
+            try:
+                get(name)
+            except Exception:
+                pass  # 실패는 status()에 기록됨, 첫 요청에서 다시 시도
+
+    if targets:
+        threading.Thread(target=run, name="subsystem-warmup", daemon=True).start()
+    return targets
@@ -0,0 +1,51 @@
+import json
+import os
+from typing import List
+import numpy as np
+from backend.query_expansion import QUERY_EXPANSION_DICT, VOCAB_DIR
+from backend.text_matcher import KeywordMatcher
+
+# ────────────── 정책 대상(태그) 어휘 ──────────────
+# vocab/target_tags.json에서 관리
+TARGET_TAGS_FILE = os.path.join(VOCAB_DIR, "target_tags.json")
+with open(TARGET_TAGS_FILE, encoding="utf-8") as f:
+    TARGET_TAGS = json.load(f)
+
+target_tag_matcher = KeywordMatcher(TARGET_TAGS)
+
+def tag_vocabulary() -> List[str]:
+    """인덱스에 비트마스크로 저장할 태그 = 정책 태그 + 쿼리 확장으로 나올 수 있는 태그"""
+    vocab = list(TARGET_TAGS)
+    for tags in QUERY_EXPANSION_DICT.values():
+        for tag in tags:
+            if tag not in vocab:
+                vocab.append(tag)
+    return vocab
+
+def encode_policy_tags(tag_strings: List[str], vocab: List[str]) -> np.ndarray:
+    """정책별 trgterIndvdlArray → (n, ceil(len(vocab)/8)) uint8 비트마스크 (np.packbits)
+
+    기존 rerank와 같이 태그 문자열이 trgterIndvdlArray에 부분 문자열로 포함되면 보유로 본다.
+    """
+    matcher = KeywordMatcher(vocab)
+    membership = np.zeros((len(tag_strings), len(vocab)), dtype="uint8")
+    for i, text in enumerate(tag_strings):
+        ids = list(matcher.find_ids(text or ""))
+        membership[i, ids] = 1
+    return np.packbits(membership, axis=1)
+
+def unpack_tags(bits: np.ndarray, vocab_size: int) -> np.ndarray:
+    return np.unpackbits(bits, axis=1, count=vocab_size)
+
+def query_tag_vector(query_tags: List[str], vocab: List[str]) -> np.ndarray:
+    index = {tag: j for j, tag in enumerate(vocab)}
+    vec = np.zeros(len(vocab), dtype="float32")
+    for tag in query_tags:
+        if tag in index:
+            vec[index[tag]] = 1.0
+    return vec
+
+def build_postings(bits: np.ndarray, vocab: List[str]) -> dict:
+    """태그 → 그 태그를 가진 정책 행 번호(int64, 오름차순) 목록"""
+    membership = unpack_tags(np.asarray(bits), len(vocab))
+    return {tag: np.flatnonzero(membership[:, j]).astype("int64") for j, tag in enumerate(vocab)}
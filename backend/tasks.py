@@ -1,50 +1,74 @@
-from celery import Celery
+from celery import Celery, group
+import asyncio
 import os
-import subprocess
-from backend.database import AsyncSessionLocal, BankAccount, Transaction
-from datetime import datetime
+from backend.database import engine
+from backend.bank_sync import sync_accounts
+from backend.forecast_jobs import find_stale_users, forecast_users
+from backend.config import (
+    FORECAST_PRECOMPUTE_PERIODS, FORECAST_PRECOMPUTE_CHUNK, BANK_SYNC_CONCURRENCY, BANK_SYNC_INTERVAL,
+)
 
 BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 celery_app = Celery("tasks", broker=BROKER_URL)
 
 celery_app.conf.beat_schedule = {
-    'rebuild_embeddings_daily': {
-        'task': 'backend.tasks.rebuild_embeddings',
+    'policy_pipeline_daily': {
+        'task': 'backend.tasks.run_policy_pipeline',
         'schedule': 24 * 3600.0,
     },
-    'rebuild_index_daily': {
-        'task': 'backend.tasks.rebuild_index',
+    'precompute_forecasts_daily': {
+        'task': 'backend.tasks.precompute_forecasts',
         'schedule': 24 * 3600.0,
     },
+    'sync_bank_accounts': {
+        'task': 'backend.tasks.sync_bank_accounts',
+        'schedule': BANK_SYNC_INTERVAL,
+    },
 }
 
-EMBED_SCRIPT = os.path.join(os.getcwd(), "scripts", "embed_policies.py")
-INDEX_SCRIPT = os.path.join(os.getcwd(), "scripts", "build_index.py")
+def run_async(coro):
+    """Celery(동기) 작업에서 async DB 코드를 실행. 커넥션 풀은 이벤트 루프에 묶이므로 끝나면 정리"""
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+    return asyncio.run(runner())
+
+@celery_app.task(name='backend.tasks.run_policy_pipeline')
+def run_policy_pipeline(skip_fetch: bool = False):
+    """fetch → structure → preprocess → embed → build → publish 를 워커 프로세스 안에서 순서대로 실행.
 
-@celery_app.task(name='backend.tasks.rebuild_embeddings')
-def rebuild_embeddings():
-    subprocess.run(['python', EMBED_SCRIPT], check=True)
+    fetch가 실패해도(BOKJIRO_API_KEY 없음, 일부 페이지 실패) 이전에 받은 데이터로 나머지 단계는 진행.
+
+    scripts 모듈의 상대 경로(data/, structured_policies/) 때문에 워커는 저장소 루트에서 실행.
+    모델은 워커 프로세스에 한 번 로드된 뒤 다음 실행에서도 재사용된다.
+    """
+    # torch/faiss는 이 작업을 처리하는 워커에서만 import
+    from scripts.pipeline import run, PipelineLocked
+    try:
+        return run(skip_fetch=skip_fetch)
+    except PipelineLocked:
+        return {"status": "locked"}
 
-@celery_app.task(name='backend.tasks.rebuild_index')
-def rebuild_index():
-    subprocess.run(['python', INDEX_SCRIPT], check=True)
+@celery_app.task(name='backend.tasks.sync_bank_accounts')
+def sync_bank_accounts(account_ids=None):
+    """전체(또는 지정한) 계좌의 새 거래를 제공자에서 받아 저장"""
+    return run_async(sync_accounts(account_ids, BANK_SYNC_CONCURRENCY))
 
 @celery_app.task(name='tasks.fetch_transactions_for_account')
 def fetch_transactions_for_account(account_id: int):
-    db = AsyncSessionLocal()
-    try:
-        dummy_transactions = [
-            {"amount": 10000.0, "description": "더미 입금 내역", "timestamp": datetime.utcnow()},
-            {"amount": -5000.0, "description": "더미 지출 내역", "timestamp": datetime.utcnow()},
-        ]
-        for tx in dummy_transactions:
-            new_tx = Transaction(
-                bank_account_id=account_id,
-                amount=tx["amount"],
-                description=tx["description"],
-                timestamp=tx["timestamp"]
-            )
-            db.add(new_tx)
-        db.commit()
-    finally:
-        db.close()
+    # 기존 작업 이름 호환: 계좌 하나만 동기화
+    return run_async(sync_accounts([account_id], 1))
+
+@celery_app.task(name='backend.tasks.precompute_forecasts')
+def precompute_forecasts():
+    """새 지출이 생긴 사용자만 골라 청크 단위 작업으로 나눠 워커들에 분산"""
+    chunks = run_async(find_stale_users(FORECAST_PRECOMPUTE_CHUNK))
+    if chunks:
+        group(forecast_users_chunk.s(chunk) for chunk in chunks).apply_async()
+    return sum(len(chunk) for chunk in chunks)
+
+@celery_app.task(name='backend.tasks.forecast_users_chunk')
+def forecast_users_chunk(user_ids):
+    return run_async(forecast_users(user_ids, FORECAST_PRECOMPUTE_PERIODS))
@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Iterable, List, Set
+
+# ────────────── 다중 키워드 매처 (Aho-Corasick) ──────────────
+# 어휘 크기와 관계없이 텍스트를 한 번만 훑어서 포함된 키워드를 모두 찾는다.
+# 결과는 `keyword in text`를 키워드마다 돌린 것과 같다 (겹치는 키워드도 모두 매칭).
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+        self._goto = [{}]      # 상태별 전이: 문자 → 다음 상태
+        self._fail = [0]
+        self._output = [()]    # 상태에서 끝나는 키워드 번호들 (fail 링크 따라 합쳐 둠)
+        for i, keyword in enumerate(self.keywords):
+            self._add(keyword, i)
+        self._build_fail_links()
+
+    def _add(self, keyword: str, i: int):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = nxt
+        self._output[state] = self._output[state] + (i,)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find_ids(self, text: str) -> Set[int]:
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """text에 포함된 키워드 목록 (어휘 등록 순서)"""
+        return [self.keywords[i] for i in sorted(self.find_ids(text))]
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from backend.database import get_db, User
 from backend.schemas import UserCreate, UserOut
-from backend.auth import get_password_hash, get_current_user
+from backend.auth import hash_password, get_current_principal
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -12,7 +12,7 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == user.email))
     if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     new_user = User(
         username=user.username,
         email=user.email,
@@ -26,5 +26,5 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserOut)
-async def get_me(current_user=Depends(get_current_user)):
+async def get_me(current_user=Depends(get_current_principal)):
     return current_user
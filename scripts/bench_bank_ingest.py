@@ -0,0 +1,67 @@
+# scripts/bench_bank_ingest.py
+# 실행 중인 API 서버에 거래를 적재하면서 단건(POST /bank/transactions/) vs 일괄(POST /bank/transactions/bulk) 처리량 비교
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+import httpx
+
+def login(session: httpx.Client, base_url: str, username: str, password: str):
+    resp = session.post(f"{base_url}/token", data={"username": username, "password": password})
+    resp.raise_for_status()
+    session.headers["Authorization"] = f"Bearer {resp.json()['access_token']}"
+
+def balance(session: httpx.Client, base_url: str, account_id: int) -> float:
+    resp = session.get(f"{base_url}/bank/accounts/")
+    resp.raise_for_status()
+    return next(a["balance"] for a in resp.json() if a["id"] == account_id)
+
+def synthetic_transactions(account_id: int, count: int, seed: int = 0):
+    """한 달치 카드 거래 비슷한 데이터"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [{
+        "bank_account_id": account_id,
+        "amount": -round(rng.uniform(1000, 80000), -2),
+        "description": f"bench-{i}",
+        "timestamp": (start + timedelta(minutes=rng.randrange(60 * 24 * 30))).isoformat(),
+    } for i in range(count)]
+
+def run_single(session, base_url, rows):
+    for row in rows:
+        session.post(f"{base_url}/bank/transactions/", json=row).raise_for_status()
+
+def run_bulk(session, base_url, rows, batch_size):
+    for i in range(0, len(rows), batch_size):
+        resp = session.post(f"{base_url}/bank/transactions/bulk", json={"transactions": rows[i:i + batch_size]})
+        resp.raise_for_status()
+        if resp.json()["failed"]:
+            raise RuntimeError(f"bulk rows failed: {resp.json()}")
+
+def report(name, count, elapsed, drift):
+    print(f"{name:<8}{count:>8}{elapsed:>10.2f}{count / elapsed:>12.1f}{drift:>14.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="거래 적재 처리량 벤치마크")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--account-id", type=int, required=True, help="벤치마크용 계좌 id (본인 계좌)")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=500, help="bulk 요청당 거래 수")
+    args = parser.parse_args()
+
+    session = httpx.Client(timeout=30.0)
+    login(session, args.base_url, args.username, args.password)
+    rows = synthetic_transactions(args.account_id, args.rows)
+    expected = sum(r["amount"] for r in rows)
+
+    # drift: 적재 후 잔액 변화 - 적재한 금액 합계 (0이 아니면 갱신 유실)
+    print(f"{'mode':<8}{'rows':>8}{'sec':>10}{'rows/sec':>12}{'balance drift':>14}")
+    for name, fn in (("single", lambda: run_single(session, args.base_url, rows)),
+                     ("bulk", lambda: run_bulk(session, args.base_url, rows, args.batch_size))):
+        before = balance(session, args.base_url, args.account_id)
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        report(name, len(rows), elapsed, balance(session, args.base_url, args.account_id) - before - expected)
@@ -0,0 +1,66 @@
+# scripts/bench_forecast.py
+# 합성 지출 데이터로 벡터화 경량 엔진(fast) vs Prophet 정확도/처리량 비교
+import argparse
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from backend.fast_forecast import forecast_batch
+from backend.forecast_pool import fit_prophet
+
+def synthetic_series(num_series: int, days: int, seed: int = 0):
+    """요일 패턴 + 완만한 추세 + 노이즈 + 가끔 큰 지출이 섞인 일별 지출"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    weekday_pattern = np.array([1.0, 0.9, 0.9, 1.0, 1.2, 1.6, 1.4])
+    series = []
+    for _ in range(num_series):
+        base = rng.uniform(10000, 60000)
+        trend = rng.normal(0, base * 0.002)
+        t = np.arange(days)
+        y = base * weekday_pattern[(t + rng.integers(7)) % 7] + trend * t
+        y += rng.normal(0, base * 0.15, size=days)
+        spikes = rng.random(days) < 0.03
+        y[spikes] += rng.uniform(2, 5, size=spikes.sum()) * base
+        series.append([(start + timedelta(days=int(d)), float(max(v, 0))) for d, v in zip(t, y)])
+    return series
+
+def evaluate(actual, predicted):
+    """MAE / MAPE / 예측구간 포함률"""
+    y = np.array([v for _, v in actual])
+    yhat = np.array([p["yhat"] for p in predicted])
+    lower = np.array([p["yhat_lower"] for p in predicted])
+    upper = np.array([p["yhat_upper"] for p in predicted])
+    mae = np.mean(np.abs(y - yhat))
+    mape = np.mean(np.abs(y - yhat) / np.maximum(np.abs(y), 1.0))
+    coverage = np.mean((y >= lower) & (y <= upper))
+    return mae, mape, coverage
+
+def report(name, scores, elapsed, count):
+    mae, mape, coverage = np.mean(scores, axis=0)
+    print(f"{name:<8}{count:>8}{count / elapsed:>14.1f}{mae:>12.0f}{mape:>9.3f}{coverage:>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="예측 엔진 벤치마크")
+    parser.add_argument("--series", type=int, default=2000, help="fast 엔진 시계열 수")
+    parser.add_argument("--prophet-series", type=int, default=20, help="Prophet으로 돌릴 시계열 수 (앞에서부터)")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--periods", type=int, default=14)
+    args = parser.parse_args()
+
+    data = synthetic_series(args.series, args.days + args.periods)
+    train = [s[:args.days] for s in data]
+    test = [s[args.days:] for s in data]
+
+    print(f"{'engine':<8}{'series':>8}{'series/sec':>14}{'MAE':>12}{'MAPE':>9}{'coverage':>10}")
+    started = time.perf_counter()
+    fast = forecast_batch(train, args.periods)
+    elapsed = time.perf_counter() - started
+    report("fast", [evaluate(a, p) for a, p in zip(test, fast)], elapsed, len(train))
+
+    n = min(args.prophet_series, len(train))
+    # 같은 시계열끼리 비교하기 위해 fast 결과도 Prophet 대상 부분집합으로 다시 집계
+    report("fast@n", [evaluate(a, p) for a, p in zip(test[:n], fast[:n])], elapsed * n / len(train), n)
+    started = time.perf_counter()
+    prophet = [fit_prophet([{"ds": ds, "y": y} for ds, y in s], args.periods) for s in train[:n]]
+    elapsed = time.perf_counter() - started
+    report("prophet", [evaluate(a, p) for a, p in zip(test[:n], prophet)], elapsed, n)
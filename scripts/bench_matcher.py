@@ -0,0 +1,63 @@
+# scripts/bench_matcher.py
+# 기존 키워드별 `in` 루프 vs KeywordMatcher(Aho-Corasick) 단일 스캔 비교
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from backend.text_matcher import KeywordMatcher
+from backend.tags import TARGET_TAGS
+
+STRUCTURED_DIR = Path("structured_policies/central")
+
+def loop_match(keywords, text):
+    return [k for k in keywords if k in text]
+
+def load_texts(limit: int):
+    texts = []
+    for json_file in sorted(STRUCTURED_DIR.glob("*.json"))[:limit]:
+        data = json.load(json_file.open(encoding="utf-8"))
+        texts.append(data.get("benefit", "") + " " + data.get("target", ""))
+    if texts:
+        return texts
+    # 구조화된 정책이 없으면 태그가 섞인 합성 문장 사용
+    rng = random.Random(0)
+    filler = "지원 대상 소득 기준 이하 가구 신청 방법 주민센터 방문 온라인 접수 "
+    return [filler * 5 + " ".join(rng.sample(TARGET_TAGS, 3)) for _ in range(limit)]
+
+def make_vocab(size: int):
+    """실제 태그에 합성 용어를 더해 size개 어휘 생성 (동의어/직업군 확장 상황 가정)"""
+    # 중복 없이 (KeywordMatcher는 중복을 합치므로 loop 방식과 결과를 비교하려면 어휘가 유일해야 함)
+    vocab = dict.fromkeys(TARGET_TAGS)
+    rng = random.Random(1)
+    syllables = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호"
+    while len(vocab) < size:
+        vocab.setdefault("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return list(vocab)[:size]
+
+def timed(fn, texts, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="키워드 매처 마이크로 벤치마크")
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sizes", default="15,100,500,2000", help="비교할 어휘 크기 (쉼표 구분)")
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts)
+    avg_len = sum(len(t) for t in texts) / len(texts)
+    print(f"{len(texts)} texts, 평균 {avg_len:.0f}자")
+    print(f"{'vocab':>7}{'loop us/doc':>14}{'matcher us/doc':>16}{'speedup':>9}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        vocab = make_vocab(size)
+        matcher = KeywordMatcher(vocab)
+        for text in texts:
+            assert matcher.find(text) == loop_match(vocab, text)
+        loop_us = timed(lambda t: loop_match(vocab, t), texts, args.repeat)
+        matcher_us = timed(matcher.find, texts, args.repeat)
+        print(f"{size:>7}{loop_us:>14.1f}{matcher_us:>16.1f}{loop_us / matcher_us:>8.1f}x")
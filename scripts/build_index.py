@@ -1,15 +1,237 @@
+import argparse
+import json
+import os
+import shutil
+import time
 import numpy as np
 import faiss
 from pathlib import Path
+from backend.index_store import (
+    VERSIONS_DIRNAME, CURRENT_FILENAME, INDEX_FILENAME, EMBEDDINGS_FILENAME,
+    INDEX_META_FILENAME, META_STORE_DIRNAME, TAG_BITS_FILENAME, TAG_VOCAB_FILENAME,
+    apply_search_params,
+)
+from backend.meta_store import write_meta_store
+from backend.tags import tag_vocabulary, encode_policy_tags
 
 DATA_DIR = Path("data")
 EMBEDDINGS_FILE = DATA_DIR / "policy_embeddings.npy"
-INDEX_FILE = DATA_DIR / "policy_index.faiss"
+META_FILE = DATA_DIR / "policy_meta.json"
+MANIFEST_FILE = DATA_DIR / "embed_manifest.json"
 
-if __name__ == '__main__':
-    embs = np.load(EMBEDDINGS_FILE)
+# 버전별 산출물: data/index_versions/<버전>/, 현재 버전은 CURRENT 파일 (레이아웃은 backend/index_store.py)
+VERSIONS_DIR = DATA_DIR / VERSIONS_DIRNAME
+CURRENT_FILE = VERSIONS_DIR / CURRENT_FILENAME
+KEEP_VERSIONS = 3
+# 버전 디렉터리 도입 전 산출물 (증분 빌드의 기준 인덱스로만 사용)
+LEGACY_INDEX_FILE = DATA_DIR / "policy_index.faiss"
+LEGACY_INDEX_META_FILE = DATA_DIR / "policy_index_meta.json"
+
+def load_json(path: Path):
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def current_version_dir():
+    if not CURRENT_FILE.exists():
+        return None
+    name = CURRENT_FILE.read_text(encoding="utf-8").strip()
+    return VERSIONS_DIR / name if name else None
+
+def previous_index_files():
+    """(인덱스 파일, 인덱스 메타 파일) — 현재 배포된 버전 기준"""
+    version_dir = current_version_dir()
+    if version_dir is not None:
+        return version_dir / INDEX_FILENAME, version_dir / INDEX_META_FILENAME
+    return LEGACY_INDEX_FILE, LEGACY_INDEX_META_FILE
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+DEFAULT_PARAMS = {
+    "nlist": None,          # None이면 벡터 수에 맞춰 자동 (≈4·√n)
+    "nprobe": 8,
+    "M": 32,                # HNSW 이웃 수
+    "efConstruction": 80,
+    "efSearch": 64,
+    "pq_m": 48,             # PQ 서브벡터 수 (dim의 약수여야 함)
+    "pq_nbits": 8,
+}
+
+def resolve_params(index_type: str, n: int, dim: int, overrides: dict = None) -> dict:
+    """index_type에 쓰이는 파라미터만 골라서 반환 (인덱스 메타에 함께 저장됨)"""
+    params = {**DEFAULT_PARAMS, **{k: v for k, v in (overrides or {}).items() if v is not None}}
+    if index_type in ("ivf_flat", "ivf_pq"):
+        # faiss는 리스트당 최소 39개 학습 벡터를 권장
+        nlist = params["nlist"] or int(4 * np.sqrt(n))
+        nlist = max(1, min(nlist, n // 39 or 1))
+        picked = {"nlist": nlist, "nprobe": min(params["nprobe"], nlist)}
+        if index_type == "ivf_pq":
+            pq_m = params["pq_m"]
+            while dim % pq_m:
+                pq_m -= 1
+            # 코드북 학습에 2^nbits개 이상 벡터 필요
+            pq_nbits = max(1, min(params["pq_nbits"], int(np.log2(max(n, 2)))))
+            picked.update({"pq_m": pq_m, "pq_nbits": pq_nbits})
+        return picked
+    if index_type == "hnsw":
+        return {"M": params["M"], "efConstruction": params["efConstruction"], "efSearch": params["efSearch"]}
+    return {}
+
+def build_full(embs: np.ndarray, index_type: str = "flat", params: dict = None):
+    params = params or {}
     dim = embs.shape[1]
-    index = faiss.IndexFlatIP(dim)  # Cosine similarity (L2 정규화된 벡터)
+    # 모두 내적(Inner Product) = 코사인 유사도 (L2 정규화된 벡터)
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "ivf_flat":
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, params["nlist"], faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "ivf_pq":
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["pq_m"], params["pq_nbits"], faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["M"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params["efConstruction"]
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 타입: {index_type}")
+    if not index.is_trained:
+        index.train(embs)
     index.add(embs)
-    faiss.write_index(index, str(INDEX_FILE))
-    print(f"Built Faiss index ({embs.shape[0]} vectors) → {INDEX_FILE}")
+    apply_search_params(index, params)
+    return index
+
+def build_incremental(embs: np.ndarray, manifest: dict):
+    """현재 배포된 인덱스에 manifest의 변경분만 반영. 적용할 수 없으면 None"""
+    index_file, index_meta_file = previous_index_files()
+    index_meta = load_json(index_meta_file)
+    if not manifest or not manifest.get("base_version") or not index_meta or not index_file.exists():
+        return None
+    # remove_ids 후 행 번호가 당겨지는 것은 IndexFlat뿐 (IVF는 id 유지, HNSW는 삭제 불가)
+    if index_meta.get("type", "flat") != "flat" or index_meta.get("version") != manifest["base_version"]:
+        return None
+    index = faiss.read_index(str(index_file))
+    if index.ntotal != manifest["base_count"]:
+        return None
+    # IndexFlat.remove_ids는 남은 벡터의 순서를 유지한 채 앞으로 당김 → embed_policies.py의 행 배치와 일치
+    if manifest["removed_rows"]:
+        index.remove_ids(np.array(manifest["removed_rows"], dtype="int64"))
+    index.add(embs[manifest["added_start"]:])
+    if index.ntotal != manifest["count"]:
+        return None
+    return index
+
+def build(full: bool = False, index_type: str = "flat", overrides: dict = None) -> Path:
+    """인덱스를 만들어 임시 버전 디렉터리에 인덱스·메타·임베딩을 함께 기록하고 그 경로를 반환"""
+    embs = np.load(EMBEDDINGS_FILE)
+    manifest = load_json(MANIFEST_FILE)
+    if manifest and manifest.get("count") != embs.shape[0]:
+        manifest = None  # manifest와 임베딩 파일이 어긋나면 전체 재빌드
+    params = resolve_params(index_type, embs.shape[0], embs.shape[1], overrides)
+
+    index = None if full or index_type != "flat" else build_incremental(embs, manifest)
+    mode = "incremental"
+    if index is None:
+        index = build_full(embs, index_type, params)
+        mode = "full"
+
+    content_version = manifest["version"] if manifest else None
+    name = time.strftime("%Y%m%d-%H%M%S") + (f"-{content_version[:8]}" if content_version else "")
+    staging_dir = VERSIONS_DIR / f".staging-{name}"
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+
+    faiss.write_index(index, str(staging_dir / INDEX_FILENAME))
+    np.save(staging_dir / EMBEDDINGS_FILENAME, embs)
+    meta = json.loads(META_FILE.read_text(encoding="utf-8"))
+    write_meta_store(meta, str(staging_dir / META_STORE_DIRNAME))
+    # 정책별 태그 보유 여부를 비트마스크로 미리 계산 → API에서 벡터 연산으로 rerank
+    vocab = tag_vocabulary()
+    np.save(staging_dir / TAG_BITS_FILENAME, encode_policy_tags([m.get("trgterIndvdlArray", "") for m in meta], vocab))
+    (staging_dir / TAG_VOCAB_FILENAME).write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+    index_meta = {
+        "type": index_type,
+        "params": params,
+        "count": int(index.ntotal),
+        "dim": int(embs.shape[1]),
+        "version": content_version,
+        "index_version": name,
+    }
+    (staging_dir / INDEX_META_FILENAME).write_text(json.dumps(index_meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Built Faiss {index_type} index ({index.ntotal} vectors, {mode}, {params}) → {staging_dir}")
+    return staging_dir
+
+def publish(staging_dir: Path) -> str:
+    """임시 디렉터리를 버전 디렉터리로 rename한 뒤 CURRENT를 원자적으로 교체"""
+    name = staging_dir.name[len(".staging-"):]
+    version_dir = VERSIONS_DIR / name
+    os.replace(staging_dir, version_dir)
+    tmp = VERSIONS_DIR / f".CURRENT.{os.getpid()}"
+    tmp.write_text(name, encoding="utf-8")
+    os.replace(tmp, CURRENT_FILE)
+    prune_versions(keep=KEEP_VERSIONS)
+    print(f"Published policy index version {name}")
+    return name
+
+def prune_versions(keep: int):
+    current = current_version_dir()
+    versions = sorted(p for p in VERSIONS_DIR.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-keep]:
+        if old != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+def run(full: bool = False, index_type: str = "flat", overrides: dict = None) -> str:
+    return publish(build(full=full, index_type=index_type, overrides=overrides))
+
+# ────────────── 벤치마크: recall@k(Flat 대비) / 검색 지연 / 메모리 ──────────────
+def benchmark(index_types, k: int = 10, num_queries: int = 200, overrides: dict = None, seed: int = 0):
+    embs = np.load(EMBEDDINGS_FILE).astype("float32")
+    n, dim = embs.shape
+    rng = np.random.default_rng(seed)
+    # 실제 쿼리 대신 정책 벡터에 약간의 노이즈를 섞어 사용 (자기 자신만 찾는 쿼리 방지)
+    queries = embs[rng.choice(n, size=min(num_queries, n), replace=False)]
+    queries = queries + rng.normal(scale=0.01, size=queries.shape).astype("float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-10
+    k = min(k, n)
+
+    _, truth = build_full(embs, "flat").search(queries, k)
+    print(f"{n} vectors, dim={dim}, {len(queries)} queries, k={k}")
+    print(f"{'type':<10}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'build s':>10}{'memory MB':>12}  params")
+    for index_type in index_types:
+        params = resolve_params(index_type, n, dim, overrides)
+        started = time.perf_counter()
+        index = build_full(embs, index_type, params)
+        build_seconds = time.perf_counter() - started
+
+        latencies = []
+        found = np.empty((len(queries), k), dtype="int64")
+        for i, q in enumerate(queries):
+            t = time.perf_counter()
+            _, I = index.search(q.reshape(1, -1), k)
+            latencies.append((time.perf_counter() - t) * 1000)
+            found[i] = I[0]
+        recall = np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(len(queries))])
+        memory_mb = faiss.serialize_index(index).nbytes / 1024 / 1024
+        print(f"{index_type:<10}{recall:>10.3f}{np.percentile(latencies, 50):>10.3f}{np.percentile(latencies, 99):>10.3f}"
+              f"{build_seconds:>10.2f}{memory_mb:>12.2f}  {params}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="정책 임베딩 Faiss 인덱스 생성 및 배포")
+    parser.add_argument("--full", action="store_true", help="manifest를 무시하고 전체 재빌드")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--nlist", type=int, help="IVF 리스트 수")
+    parser.add_argument("--nprobe", type=int, help="IVF 검색 시 탐색 리스트 수")
+    parser.add_argument("--M", type=int, dest="M", help="HNSW 이웃 수")
+    parser.add_argument("--ef-construction", type=int, dest="efConstruction")
+    parser.add_argument("--ef-search", type=int, dest="efSearch")
+    parser.add_argument("--pq-m", type=int, dest="pq_m", help="IVF-PQ 서브벡터 수")
+    parser.add_argument("--pq-nbits", type=int, dest="pq_nbits")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="배포하지 않고 인덱스 타입별 recall@k / 지연 / 메모리 비교")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    overrides = {name: getattr(args, name) for name in DEFAULT_PARAMS}
+    if args.benchmark:
+        benchmark(INDEX_TYPES, k=args.k, num_queries=args.queries, overrides=overrides)
+    else:
+        run(full=args.full, index_type=args.index_type, overrides=overrides)
@@ -1,6 +1,12 @@
+import argparse
+import hashlib
 import json
+import os
+import time
 import numpy as np
+from multiprocessing import Pool
 from pathlib import Path
+from typing import List
 from transformers import AutoTokenizer, AutoModel
 import torch
 
@@ -8,40 +14,229 @@ STRUCTURED_DIR = Path("structured_policies/central")
 DATA_DIR = Path("data")
 EMBEDDINGS_FILE = DATA_DIR / "policy_embeddings.npy"
 META_FILE = DATA_DIR / "policy_meta.json"
+MANIFEST_FILE = DATA_DIR / "embed_manifest.json"
+CACHE_VECTORS_FILE = DATA_DIR / "embedding_cache.npy"
+CACHE_KEYS_FILE = DATA_DIR / "embedding_cache.json"
 
-tokenizer = AutoTokenizer.from_pretrained("monologg/kobert", trust_remote_code=True)
-model = AutoModel.from_pretrained("monologg/kobert", trust_remote_code=True)
-model.eval()
+MODEL_NAME = "monologg/kobert"
+MAX_LENGTH = 512
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_WORKERS = 1
+# 캐시 키에 포함되는 모델 식별자 (모델/최대 길이가 바뀌면 캐시 전체 무효화)
+MODEL_ID = f"{MODEL_NAME}@{MAX_LENGTH}"
+
+# 프로세스마다 한 번만 로드 (워커 프로세스는 initializer에서 로드)
+tokenizer = None
+model = None
+
+def load_tokenizer():
+    global tokenizer
+    if tokenizer is None:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, trust_remote_code=True)
+    return tokenizer
+
+def load_model():
+    global model
+    if model is None:
+        model = AutoModel.from_pretrained(MODEL_NAME, trust_remote_code=True)
+        model.eval()
+    return load_tokenizer(), model
 
 def embed_text(text: str) -> np.ndarray:
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+    tokenizer, model = load_model()
+    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=MAX_LENGTH)
     with torch.no_grad():
         out = model(**inputs).last_hidden_state.mean(dim=1).squeeze().numpy()
         out = out / (np.linalg.norm(out) + 1e-10)  # L2 정규화(코사인 유사도)
     return out
 
-if __name__ == '__main__':
-    embeddings = []
-    meta = []
-    for json_file in STRUCTURED_DIR.glob("*.json"):
+def embed_batch(texts: List[str]) -> np.ndarray:
+    """배치 내 가장 긴 문장 길이까지만 패딩해서 한 번에 임베딩"""
+    tokenizer, model = load_model()
+    inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=MAX_LENGTH)
+    with torch.no_grad():
+        hidden = model(**inputs).last_hidden_state
+        # 패딩 토큰은 제외하고 평균 → 단건 embed_text()의 mean(dim=1)과 동일한 값
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        out = ((hidden * mask).sum(dim=1) / mask.sum(dim=1)).numpy()
+    out = out / (np.linalg.norm(out, axis=1, keepdims=True) + 1e-10)
+    return out.astype("float32")
+
+def build_text(data: dict) -> str:
+    return " ".join([
+        data.get("benefit", ""),
+        data.get("target", ""),
+        data.get("trgterIndvdlArray", ""),
+        data.get("lifeArray", ""),
+        data.get("intrsThemaArray", ""),
+    ])
+
+def build_meta(data: dict) -> dict:
+    return {
+        "servId": data.get("servId", ""),
+        "policy_name": data.get("policy_name", ""),
+        "url": data.get("url", ""),
+        "trgterIndvdlArray": data.get("trgterIndvdlArray", "")
+    }
+
+def make_batches(texts: List[str], batch_size: int) -> List[List[int]]:
+    """토큰 길이순으로 정렬 후 batch_size 단위로 묶음(비슷한 길이끼리 → 패딩 최소화)"""
+    lengths = [
+        len(ids) for ids in load_tokenizer()(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+    ]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+def _init_worker(num_threads: int):
+    torch.set_num_threads(num_threads)
+    load_model()
+
+def _embed_job(job):
+    indices, texts = job
+    return indices, embed_batch(texts)
+
+def embed_all(texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS) -> np.ndarray:
+    """texts 순서 그대로 (len(texts), dim) 임베딩 행렬 반환"""
+    if not texts:
+        return np.zeros((0, 0), dtype="float32")
+    if batch_size <= 1:
+        return np.stack([embed_text(t) for t in texts]).astype("float32")
+
+    jobs = [(idx, [texts[i] for i in idx]) for idx in make_batches(texts, batch_size)]
+    result = None
+
+    def collect(indices, vecs):
+        nonlocal result
+        if result is None:
+            result = np.zeros((len(texts), vecs.shape[1]), dtype="float32")
+        result[indices] = vecs
+
+    if workers <= 1:
+        for job in jobs:
+            collect(*_embed_job(job))
+    else:
+        num_threads = max(1, (os.cpu_count() or 1) // workers)
+        with Pool(workers, initializer=_init_worker, initargs=(num_threads,)) as pool:
+            for indices, vecs in pool.imap_unordered(_embed_job, jobs):
+                collect(indices, vecs)
+    return result
+
+def load_policies():
+    """(정책 키=파일명, 정책 데이터) 목록"""
+    policies = []
+    for json_file in sorted(STRUCTURED_DIR.glob("*.json")):
         data = json.load(json_file.open(encoding="utf-8"))
-        text = " ".join([
-            data.get("benefit", ""),
-            data.get("target", ""),
-            data.get("trgterIndvdlArray", ""),
-            data.get("lifeArray", ""),
-            data.get("intrsThemaArray", ""),
-        ])
-        vec = embed_text(text)
-        embeddings.append(vec)
-        meta.append({
-            "servId": data.get("servId", ""),
-            "policy_name": data.get("policy_name", ""),
-            "url": data.get("url", ""),
-            "trgterIndvdlArray": data.get("trgterIndvdlArray", "")
-        })
+        policies.append((json_file.stem, data))
+    return policies
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(f"{MODEL_ID}\n{text}".encode("utf-8")).hexdigest()
+
+def rows_version(rows) -> str:
+    """[(정책 키, content_hash), ...] 배치 순서 전체에 대한 버전 해시"""
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+def load_cache() -> dict:
+    """content_hash → 임베딩 벡터"""
+    if not (CACHE_KEYS_FILE.exists() and CACHE_VECTORS_FILE.exists()):
+        return {}
+    keys = json.loads(CACHE_KEYS_FILE.read_text(encoding="utf-8"))
+    if keys.get("model") != MODEL_ID:
+        return {}
+    vectors = np.load(CACHE_VECTORS_FILE)
+    return {h: vectors[i] for i, h in enumerate(keys["hashes"])}
+
+def save_cache(hashes: List[str], embs: np.ndarray):
+    np.save(CACHE_VECTORS_FILE, embs)
+    CACHE_KEYS_FILE.write_text(json.dumps({"model": MODEL_ID, "hashes": hashes}), encoding="utf-8")
+
+def load_previous_rows() -> list:
+    if not (MANIFEST_FILE.exists() and META_FILE.exists()):
+        return []
+    manifest = json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    if manifest.get("model") != MODEL_ID:
+        return []
+    return [tuple(row) for row in manifest.get("rows", [])]
+
+def plan_rows(current: dict, previous_rows: list):
+    """변경 없는 정책은 기존 순서를 유지하고, 신규/변경 정책은 뒤에 붙인다.
+
+    이렇게 하면 build_index.py가 기존 인덱스에서 removed_rows를 지우고
+    added_start 이후 행만 add 해도 전체 재빌드와 같은 결과가 된다.
+    """
+    kept = [key for key, h in previous_rows if current.get(key, (None,))[0] == h]
+    kept_set = set(kept)
+    appended = [key for key in current if key not in kept_set]
+    removed_rows = [row for row, (key, _) in enumerate(previous_rows) if key not in kept_set]
+    return kept + appended, removed_rows, len(kept)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="정책 문서 KoBERT 임베딩 생성")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="배치 크기 (1이면 기존 단건 모드)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="임베딩 워커 프로세스 수")
+    parser.add_argument("--full", action="store_true",
+                        help="임베딩 캐시를 무시하고 전체 재임베딩")
+    return parser.parse_args()
+
+def run(batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS, full: bool = False) -> dict:
+    """임베딩 캐시를 이용해 신규/변경 정책만 임베딩하고 manifest를 반환"""
+    policies = load_policies()
+    # 정책 키 → (content_hash, text, meta)
+    current = {}
+    for key, data in policies:
+        text = build_text(data)
+        current[key] = (content_hash(text), text, build_meta(data))
+
+    previous_rows = [] if full else load_previous_rows()
+    cache = {} if full else load_cache()
+    order, removed_rows, added_start = plan_rows(current, previous_rows)
+
+    previous_keys = {key for key, _ in previous_rows}
+    to_embed = sorted({current[key][0]: current[key][1] for key in order if current[key][0] not in cache}.items())
+    started = time.perf_counter()
+    new_embs = embed_all([text for _, text in to_embed], batch_size=batch_size, workers=workers)
+    elapsed = time.perf_counter() - started
+    for (h, _), vec in zip(to_embed, new_embs):
+        cache[h] = vec
+
+    hashes = [current[key][0] for key in order]
+    embs = np.stack([cache[h] for h in hashes]).astype("float32")
+    meta = [current[key][2] for key in order]
+    rows = [[key, current[key][0]] for key in order]
+
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    embs = np.stack(embeddings).astype("float32")
     np.save(EMBEDDINGS_FILE, embs)
     META_FILE.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Saved {len(embeddings)} embeddings → {EMBEDDINGS_FILE}")
+    # 삭제된 정책의 캐시는 버리고 현재 정책만 유지
+    unique_hashes = sorted(set(hashes))
+    save_cache(unique_hashes, np.stack([cache[h] for h in unique_hashes]).astype("float32"))
+
+    current_keys = set(current)
+    manifest = {
+        "model": MODEL_ID,
+        "base_version": rows_version([list(r) for r in previous_rows]) if previous_rows else None,
+        "version": rows_version(rows),
+        "base_count": len(previous_rows),
+        "count": len(order),
+        "added_start": added_start,
+        "removed_rows": removed_rows,
+        "added": [key for key in order[added_start:] if key not in previous_keys],
+        "changed": [key for key in order[added_start:] if key in previous_keys],
+        "removed": [key for key, _ in previous_rows if key not in current_keys],
+        "embedded": len(to_embed),
+        "rows": rows,
+    }
+    MANIFEST_FILE.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"Saved {len(order)} embeddings → {EMBEDDINGS_FILE}")
+    print(f"added={len(manifest['added'])} changed={len(manifest['changed'])} "
+          f"removed={len(manifest['removed'])} cache_hits={len(order) - len(to_embed)}")
+    print(f"Embedded {len(to_embed)} docs in {elapsed:.1f}s "
+          f"({len(to_embed) / max(elapsed, 1e-9):.1f} docs/sec, batch_size={batch_size}, workers={workers})")
+    return manifest
+
+if __name__ == '__main__':
+    args = parse_args()
+    run(batch_size=args.batch_size, workers=args.workers, full=args.full)
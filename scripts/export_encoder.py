@@ -0,0 +1,46 @@
+# scripts/export_encoder.py
+# KoBERT 인코더를 ONNX로 export (ENCODER_BACKEND=onnx 에서 사용)
+import argparse
+import torch
+from transformers import AutoModel
+from backend.encoder import MODEL_ID, load_tokenizer
+
+DEFAULT_OUTPUT = "data/kobert_encoder.onnx"
+
+class LastHiddenState(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                          token_type_ids=token_type_ids).last_hidden_state
+
+def export(output: str, opset: int = 14):
+    tokenizer = load_tokenizer()
+    model = AutoModel.from_pretrained(MODEL_ID, trust_remote_code=True)
+    model.eval()
+    sample = tokenizer(["배달 알바 청년 지원", "독거 노인"], return_tensors="pt", padding=True)
+    if "token_type_ids" not in sample:
+        sample["token_type_ids"] = torch.zeros_like(sample["input_ids"])
+    dynamic = {0: "batch", 1: "sequence"}
+    torch.onnx.export(
+        LastHiddenState(model),
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        output,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": dynamic, "attention_mask": dynamic, "token_type_ids": dynamic,
+            "last_hidden_state": dynamic,
+        },
+        opset_version=opset,
+    )
+    print(f"Exported {MODEL_ID} → {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KoBERT 인코더 ONNX export")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+    export(args.output, args.opset)
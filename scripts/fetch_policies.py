@@ -1,81 +1,263 @@
 # scripts/fetch_policies.py
+# 복지로 중앙부처 복지서비스 목록을 페이지 단위로 받아 raw_policies/central/ 에 저장
+#
+# - httpx.AsyncClient 하나로 커넥션 재사용, 동시 요청 수 제한 + 초당 요청 수 제한
+# - 실패(네트워크 오류, 429/5xx)는 지수 백오프로 재시도
+# - 응답 XML은 받는 대로 조금씩 파싱(XMLPullParser) → 500행 페이지 전체 트리를 메모리에 올리지 않음
+# - 완료한 페이지는 체크포인트에 기록 → 중단 후 다시 실행하면 남은 페이지부터 이어서
+# - 내용이 바뀌지 않은 페이지는 파일을 다시 쓰지 않음
+#
+# 로컬 테스트: python -m scripts.mock_bokjiro_server 로 대체 서버를 띄우고
+#   python -m scripts.fetch_policies --base-url http://127.0.0.1:8765/list
 
+import argparse
+import asyncio
+import hashlib
+import json
 import os
-import requests
+import random
+import time
 import xml.etree.ElementTree as ET
-import json
 from pathlib import Path
-from urllib.parse import urlencode, quote_plus
+from typing import Optional
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
-SERVICE_KEY = os.getenv("BOKJIRO_API_KEY")
-if not SERVICE_KEY:
-    raise RuntimeError("`.env`에 BOKJIRO_API_KEY가 설정되어 있지 않습니다.")
 
-# HTTPS 사용
-BASE_URL = "https://apis.data.go.kr/B554287/NationalWelfareInformationsV001/NationalWelfarelistV001"
+OFFICIAL_BASE_URL = "https://apis.data.go.kr/B554287/NationalWelfareInformationsV001/NationalWelfarelistV001"
+# 대체 서버로 돌릴 때는 BOKJIRO_BASE_URL 또는 --base-url
+BASE_URL = os.getenv("BOKJIRO_BASE_URL", OFFICIAL_BASE_URL)
 
-# “원본 키”를 그대로 params에 넣어두면, urlencode가 자동 인코딩해 줍니다.
 DEFAULT_PARAMS = {
-    "serviceKey": SERVICE_KEY,  # 원본(디코딩된) 키
     "callTp":     "L",
-    "pageNo":     1,
-    "numOfRows":  500,
     "srchKeyCode":"001",        # “제목” 검색 코드 (필요 시 변경)
 }
+PER_PAGE = 500
 
 RAW_DIR = Path("raw_policies/central")
-RAW_DIR.mkdir(parents=True, exist_ok=True)
+CHECKPOINT_FILE = Path("data/fetch_checkpoint.json")
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 5.0          # 초당 최대 요청 수
+DEFAULT_RETRIES = 5
+DEFAULT_TIMEOUT = 30.0
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HEADER_FIELDS = ("totalCount", "pageNo", "numOfRows", "resultCode", "resultMessage")
+
+
+class RetryableStatus(Exception):
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status_code}")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """요청 시작 간격을 1/rate 초 이상으로 유지 (동시 요청 사이에서도 공유)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class PageParser:
+    """응답 청크를 받는 대로 파싱. servList 항목은 dict로 바꾼 뒤 바로 해제"""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._depth = 0
+        self.result = {field: None for field in HEADER_FIELDS}
+        self.result["servList"] = []
+
+    def feed(self, chunk: bytes):
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self) -> dict:
+        self._parser.close()
+        self._drain()
+        return self.result
+
+    def _drain(self):
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                continue
+            self._depth -= 1
+            # 루트 바로 아래 요소만 처리 (depth 1)
+            if self._depth != 1:
+                continue
+            if elem.tag == "servList":
+                self.result["servList"].append({child.tag: child.text or "" for child in elem})
+            elif elem.tag in HEADER_FIELDS:
+                self.result[elem.tag] = elem.text
+            elem.clear()
+
+
+def content_hash(data: dict) -> str:
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_checkpoint() -> dict:
+    if CHECKPOINT_FILE.exists():
+        return json.loads(CHECKPOINT_FILE.read_text(encoding="utf-8"))
+    return {"completed": [], "hashes": {}}
+
+
+def save_checkpoint(checkpoint: dict):
+    CHECKPOINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHECKPOINT_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, CHECKPOINT_FILE)
+
+
+def page_file(page: int) -> Path:
+    return RAW_DIR / f"welfare_list_page_{page}.json"
+
+
+class Fetcher:
+    def __init__(self, base_url: str, service_key: Optional[str], concurrency: int = DEFAULT_CONCURRENCY,
+                 rate: float = DEFAULT_RATE, retries: int = DEFAULT_RETRIES, timeout: float = DEFAULT_TIMEOUT):
+        self.base_url = base_url
+        self.params = dict(DEFAULT_PARAMS, serviceKey=service_key or "")
+        self.retries = retries
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.limiter = RateLimiter(rate)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max(1, concurrency), max_keepalive_connections=max(1, concurrency)),
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _fetch_once(self, params: dict) -> dict:
+        async with self.client.stream("GET", self.base_url, params=params) as resp:
+            if resp.status_code in RETRY_STATUSES:
+                retry_after = resp.headers.get("Retry-After")
+                raise RetryableStatus(resp.status_code, float(retry_after) if retry_after and retry_after.isdigit() else None)
+            resp.raise_for_status()
+            parser = PageParser()
+            async for chunk in resp.aiter_bytes():
+                parser.feed(chunk)
+            return parser.close()
+
+    async def fetch_page(self, page: int, per_page: int = PER_PAGE) -> dict:
+        params = dict(self.params, pageNo=page, numOfRows=per_page)
+        async with self.semaphore:
+            for attempt in range(self.retries + 1):
+                await self.limiter.wait()
+                try:
+                    return await self._fetch_once(params)
+                except (httpx.TransportError, RetryableStatus, ET.ParseError) as e:
+                    if attempt == self.retries:
+                        raise
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random())
+                    if isinstance(e, RetryableStatus) and e.retry_after is not None:
+                        delay = max(delay, e.retry_after)
+                    print(f"page {page}: {e!r} → {delay:.1f}s 후 재시도 ({attempt + 1}/{self.retries})")
+                    await asyncio.sleep(delay)
+
+
+async def crawl(base_url: str, service_key: Optional[str], concurrency: int = DEFAULT_CONCURRENCY,
+                rate: float = DEFAULT_RATE, retries: int = DEFAULT_RETRIES, restart: bool = False,
+                per_page: int = PER_PAGE) -> dict:
+    """전체 페이지 수집. 결과 요약 dict(pages, fetched, written, unchanged, resumed) 반환"""
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    checkpoint = load_checkpoint()
+    if restart:
+        checkpoint["completed"] = []
+
+    fetcher = Fetcher(base_url, service_key, concurrency=concurrency, rate=rate, retries=retries)
+    summary = {"pages": 0, "fetched": 0, "written": 0, "unchanged": 0, "resumed": 0, "records": 0}
+    try:
+        first = await fetcher.fetch_page(1, per_page=10)
+        total_count = int(first["totalCount"] or 0)
+        if total_count == 0:
+            print("조회된 서비스가 없습니다:", first.get("resultMessage"))
+            return summary
+        total_pages = (total_count + per_page - 1) // per_page
+        summary["pages"] = total_pages
+        summary["records"] = total_count
 
+        # 전체 건수가 바뀌면 페이지 경계가 달라지므로 이어받기 없이 처음부터
+        if checkpoint.get("total_count") != total_count or checkpoint.get("per_page") != per_page:
+            checkpoint["completed"] = []
+        checkpoint.update(total_count=total_count, per_page=per_page)
+        completed = set(checkpoint["completed"])
+        summary["resumed"] = len(completed)
+        pending = [p for p in range(1, total_pages + 1) if p not in completed]
 
-def fetch_welfare_list(page: int = 1, per_page: int = 500) -> dict:
-    params = DEFAULT_PARAMS.copy()
-    params["pageNo"] = page
-    params["numOfRows"] = per_page
+        async def fetch_and_store(page: int):
+            data = await fetcher.fetch_page(page, per_page)
+            summary["fetched"] += 1
+            digest = content_hash(data)
+            path = page_file(page)
+            if checkpoint["hashes"].get(str(page)) == digest and path.exists():
+                summary["unchanged"] += 1
+                status = "Unchanged"
+            else:
+                status = "Saved"
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                checkpoint["hashes"][str(page)] = digest
+                summary["written"] += 1
+            completed.add(page)
+            checkpoint["completed"] = sorted(completed)
+            save_checkpoint(checkpoint)
+            print(f"{status} page {page}/{total_pages} → {path}")
 
-    # urlencode가 serviceKey를 포함한 모든 값을 적절히 인코딩해 줍니다.
-    url = f"{BASE_URL}?{urlencode(params, quote_via=quote_plus)}"
-    resp = requests.get(url)
-    resp.raise_for_status()
+        # 일부 페이지가 실패해도 나머지는 받고 체크포인트에 남긴 뒤 실패를 알린다
+        results = await asyncio.gather(*(fetch_and_store(p) for p in pending), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            raise RuntimeError(f"{len(errors)}개 페이지 수집 실패 (다시 실행하면 이어서 받음): {errors[0]!r}")
 
-    xml_root = ET.fromstring(resp.content)
-    result = {
-        "totalCount": xml_root.findtext("totalCount"),
-        "pageNo":     xml_root.findtext("pageNo"),
-        "numOfRows":  xml_root.findtext("numOfRows"),
-        "resultCode": xml_root.findtext("resultCode"),
-        "resultMessage": xml_root.findtext("resultMessage"),
-        "servList":   []
-    }
+        # 한 바퀴 완료 → 다음 실행은 전체를 다시 확인 (해시는 유지해서 변경 없는 페이지는 쓰지 않음)
+        for stale in [k for k in checkpoint["hashes"] if int(k) > total_pages]:
+            del checkpoint["hashes"][stale]
+        checkpoint["completed"] = []
+        save_checkpoint(checkpoint)
+    finally:
+        await fetcher.close()
+    return summary
 
-    for serv in xml_root.findall("servList"):
-        item = {}
-        for child in serv:
-            item[child.tag] = child.text or ""
-        result["servList"].append(item)
 
-    return result
+def run(base_url: str = None, concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+        retries: int = DEFAULT_RETRIES, restart: bool = False) -> dict:
+    base_url = base_url or BASE_URL
+    service_key = os.getenv("BOKJIRO_API_KEY")
+    if not service_key and base_url == OFFICIAL_BASE_URL:
+        raise RuntimeError("`.env`에 BOKJIRO_API_KEY가 설정되어 있지 않습니다.")
+    started = time.perf_counter()
+    summary = asyncio.run(crawl(base_url, service_key, concurrency=concurrency, rate=rate,
+                                retries=retries, restart=restart))
+    print(f"전체 정책 목록 조회 및 저장 완료. {summary} ({time.perf_counter() - started:.1f}s)")
+    return summary
 
 
 def main():
-    first = fetch_welfare_list(page=1, per_page=10)
-    total_count = int(first["totalCount"] or 0)
-    if total_count == 0:
-        print("조회된 서비스가 없습니다:", first.get("resultMessage"))
-        return
-
-    per_page = 500
-    total_pages = (total_count + per_page - 1) // per_page
-
-    for page in range(1, total_pages + 1):
-        data = fetch_welfare_list(page=page, per_page=per_page)
-        filename = RAW_DIR / f"welfare_list_page_{page}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved page {page}/{total_pages} → {filename}")
-
-    print("전체 정책 목록 조회 및 저장 완료.")
+    parser = argparse.ArgumentParser(description="복지로 정책 목록 수집")
+    parser.add_argument("--base-url", default=None, help="목록 API 주소 (기본: BOKJIRO_BASE_URL 또는 공식 API)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시 요청 수")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="페이지별 최대 재시도 횟수")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 수집")
+    args = parser.parse_args()
+    run(args.base_url, concurrency=args.concurrency, rate=args.rate, retries=args.retries, restart=args.restart)
 
 
 if __name__ == "__main__":
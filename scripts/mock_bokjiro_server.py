@@ -0,0 +1,105 @@
+# scripts/mock_bokjiro_server.py
+# fetch_policies.py 테스트용 복지로 목록 API 대체 서버 (표준 라이브러리만 사용)
+#
+#   python -m scripts.mock_bokjiro_server --recordings scripts/fixtures/bokjiro   # XML 응답 재생
+#   python -m scripts.mock_bokjiro_server --total 1800 --fail-rate 0.2            # 합성 데이터 + 간헐적 503
+#
+# 디렉터리의 *.xml(공식 API 응답 형식)에서 servList 항목을 모두 읽어 두고,
+# 요청의 pageNo/numOfRows에 맞게 다시 잘라서 응답한다.
+# scripts/smoke_fetch_policies.py가 이 서버로 재시도/이어받기/변경 없는 페이지 건너뛰기를 확인한다.
+
+import argparse
+import random
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+def load_recordings(directory: Path):
+    items = []
+    for xml_file in sorted(directory.glob("*.xml")):
+        root = ET.parse(xml_file).getroot()
+        for serv in root.findall("servList"):
+            items.append([(child.tag, child.text or "") for child in serv])
+    return items
+
+def synthetic_items(total: int):
+    return [[
+        ("servId", f"WLF{i:08d}"),
+        ("servNm", f"테스트 복지서비스 {i}"),
+        ("jurMnofNm", "보건복지부"),
+        ("servDgst", f"합성 정책 {i} 요약"),
+        ("trgterIndvdlArray", random.Random(i).choice(["저소득", "장애인", "노인", "청년", "다문화·탈북민"])),
+        ("servDtlLink", f"https://www.bokjiro.go.kr/ssis-tbu/twataa/wlfareInfo/moveTWAT52011M.do?wlfareInfoId=WLF{i:08d}"),
+    ] for i in range(1, total + 1)]
+
+def render_page(items, page: int, per_page: int) -> bytes:
+    rows = items[(page - 1) * per_page: page * per_page]
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?><wantedList>',
+        f"<totalCount>{len(items)}</totalCount><pageNo>{page}</pageNo><numOfRows>{per_page}</numOfRows>",
+        "<resultCode>0</resultCode><resultMessage>SUCCESS</resultMessage>",
+    ]
+    for row in rows:
+        parts.append("<servList>" + "".join(f"<{tag}>{escape(text)}</{tag}>" for tag, text in row) + "</servList>")
+    parts.append("</wantedList>")
+    return "".join(parts).encode("utf-8")
+
+def make_handler(items, latency: float = 0.0):
+    """실패 설정은 server.fail_rate / server.fail_pages(항상 503으로 응답할 pageNo 집합)에서 읽는다"""
+    rng = random.Random(0)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive (클라이언트 커넥션 재사용 확인용)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get("pageNo", ["1"])[0])
+            per_page = int(query.get("numOfRows", ["10"])[0])
+            with lock:
+                fail = rng.random() < getattr(self.server, "fail_rate", 0.0)
+            fail = fail or page in getattr(self.server, "fail_pages", ())
+            if latency:
+                time.sleep(latency)
+            if fail:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = render_page(items, page, per_page)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml; charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def make_server(items, host: str = "127.0.0.1", port: int = 8765, fail_rate: float = 0.0, latency: float = 0.0):
+    server = ThreadingHTTPServer((host, port), make_handler(items, latency))
+    server.fail_rate = fail_rate
+    server.fail_pages = set()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="복지로 목록 API 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", type=Path, default=None, help="녹화된 XML 응답 디렉터리")
+    parser.add_argument("--total", type=int, default=1200, help="녹화가 없을 때 합성할 서비스 수")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503으로 응답할 확률 (재시도 확인용)")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    args = parser.parse_args()
+
+    items = load_recordings(args.recordings) if args.recordings else synthetic_items(args.total)
+    server = make_server(items, args.host, args.port, fail_rate=args.fail_rate, latency=args.latency)
+    print(f"mock bokjiro: {len(items)} services on http://{args.host}:{args.port}/list")
+    server.serve_forever()
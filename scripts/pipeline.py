@@ -0,0 +1,284 @@
+# scripts/pipeline.py
+# 정책 데이터 파이프라인: fetch → structure → preprocess → embed → build index → publish
+#
+# - 각 단계를 한 프로세스 안에서 순서대로 실행 (모델/인터프리터 로드는 한 번, 앞 단계가 끝나야 다음 단계)
+# - 단계가 끝날 때마다 입력 fingerprint와 결과를 data/pipeline_state.json에 기록
+#   → 입력이 그대로인 단계는 건너뛰고, 중간에 실패해도 다음 실행은 끝난 단계를 다시 하지 않음
+# - fetch가 실패하면(API 키 없음, 일부 페이지 실패 등) 이미 받아 둔 데이터로 나머지 단계를 계속 진행
+# - 동시 실행 방지: Redis 락 (Redis에 연결할 수 없으면 로컬 파일 락)
+#
+#   python -m scripts.pipeline                 # 전체
+#   python -m scripts.pipeline --skip-fetch    # 이미 받은 데이터로 임베딩/인덱스만
+#   python -m scripts.pipeline --force embed   # 해당 단계부터 강제 실행
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from backend.config import CELERY_BROKER_URL
+from backend.logging_module import logger
+from backend.query_expansion import VOCAB_DIR
+
+DATA_DIR = Path("data")
+RAW_DIR = Path("raw_policies/central")
+STATE_FILE = DATA_DIR / "pipeline_state.json"
+LOCAL_LOCK_FILE = DATA_DIR / "pipeline.lock"
+STRUCTURED_DIR = Path("structured_policies/central")
+TARGET_TAGS_FILE = Path(VOCAB_DIR) / "target_tags.json"
+QUERY_EXPANSION_FILE = Path(VOCAB_DIR) / "query_expansion.json"
+
+STAGES = ("fetch", "structure", "preprocess", "embed", "build", "publish")
+LOCK_NAME = "nextstep:lock:policy_pipeline"
+LOCK_TIMEOUT = float(os.getenv("PIPELINE_LOCK_TIMEOUT", str(6 * 3600)))
+
+
+class PipelineLocked(Exception):
+    pass
+
+
+# ────────────── fingerprint / 상태 ──────────────
+def fingerprint(*inputs) -> str:
+    """입력 해시. Path(디렉터리)는 *.json 파일 이름+내용, Path(파일)는 내용, 그 외 값은 JSON으로"""
+    h = hashlib.sha256()
+    for item in inputs:
+        if isinstance(item, Path) and item.is_dir():
+            for path in sorted(item.glob("*.json")):
+                h.update(path.name.encode("utf-8"))
+                h.update(hashlib.sha256(path.read_bytes()).digest())
+        elif isinstance(item, Path):
+            h.update(item.read_bytes() if item.exists() else b"")
+        else:
+            h.update(json.dumps(item, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    return {"stages": {}}
+
+
+def save_state(state: dict):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, STATE_FILE)
+
+
+# ────────────── 동시 실행 방지 ──────────────
+@contextlib.contextmanager
+def pipeline_lock(redis_url: str = CELERY_BROKER_URL, timeout: float = LOCK_TIMEOUT):
+    """여러 워커/호스트 사이에서는 Redis 락, Redis를 못 쓰면 같은 호스트 안에서만 막는 파일 락"""
+    lock = None
+    try:
+        import redis
+        client = redis.Redis.from_url(redis_url)
+        client.ping()
+        lock = client.lock(LOCK_NAME, timeout=timeout, blocking=False)
+    except Exception as e:
+        logger.warning(f"pipeline: Redis 락 사용 불가 ({e}) → 로컬 파일 락 사용")
+
+    if lock is not None:
+        if not lock.acquire():
+            raise PipelineLocked("다른 파이프라인 실행이 진행 중입니다.")
+        try:
+            yield
+        finally:
+            try:
+                lock.release()
+            except Exception as e:
+                # 락 timeout을 넘겨 이미 만료된 경우
+                logger.warning(f"pipeline: 락 해제 실패 ({e})")
+        return
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOCAL_LOCK_FILE, "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise PipelineLocked("다른 파이프라인 실행이 진행 중입니다.")
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# ────────────── 단계 ──────────────
+# 각 단계: fingerprint(ctx) → 입력 fingerprint (None이면 항상 실행)
+#          execute(ctx) → 결과 dict (records: 처리 건수 포함)
+#          is_valid(result) → 이전 결과가 아직 유효한지 (출력 파일이 남아 있는지 등)
+
+def fetch_fingerprint(ctx):
+    # 원격 데이터는 실행해 봐야 바뀌었는지 알 수 있으므로 항상 실행 (변경 없는 페이지는 fetch가 알아서 쓰지 않음)
+    return None
+
+def fetch_execute(ctx):
+    from scripts import fetch_policies
+    summary = fetch_policies.run(ctx.get("base_url"))
+    return {"records": summary["records"], "pages": summary["pages"], "written": summary["written"]}
+
+def structure_fingerprint(ctx):
+    return fingerprint(RAW_DIR)
+
+def structure_execute(ctx):
+    from scripts import structure_policies
+    return structure_policies.run()
+
+def preprocess_fingerprint(ctx):
+    return fingerprint(STRUCTURED_DIR, TARGET_TAGS_FILE)
+
+def preprocess_execute(ctx):
+    from scripts import preprocess_policies
+    return {"records": preprocess_policies.run()}
+
+def embed_fingerprint(ctx):
+    from scripts.embed_policies import MODEL_ID
+    return fingerprint(STRUCTURED_DIR, MODEL_ID)
+
+def embed_execute(ctx):
+    from scripts import embed_policies
+    manifest = embed_policies.run(
+        batch_size=ctx["batch_size"] or embed_policies.DEFAULT_BATCH_SIZE,
+        workers=ctx["workers"] or embed_policies.DEFAULT_WORKERS,
+    )
+    return {
+        "records": manifest["count"],
+        "embedded": manifest["embedded"],
+        "added": len(manifest["added"]),
+        "changed": len(manifest["changed"]),
+        "removed": len(manifest["removed"]),
+        "version": manifest["version"],
+    }
+
+def embed_is_valid(result):
+    from scripts.embed_policies import EMBEDDINGS_FILE, MANIFEST_FILE
+    if not (EMBEDDINGS_FILE.exists() and MANIFEST_FILE.exists()):
+        return False
+    return json.loads(MANIFEST_FILE.read_text(encoding="utf-8")).get("version") == result.get("version")
+
+def build_fingerprint(ctx):
+    from scripts.build_index import MANIFEST_FILE
+    manifest = json.loads(MANIFEST_FILE.read_text(encoding="utf-8")) if MANIFEST_FILE.exists() else {}
+    # tag_vocabulary()가 두 어휘 파일을 합쳐 tags.json/tag_bits.npy에 굽는다
+    return fingerprint(
+        manifest.get("version"), ctx["index_type"], ctx["overrides"], TARGET_TAGS_FILE, QUERY_EXPANSION_FILE,
+    )
+
+def build_execute(ctx):
+    from scripts import build_index
+    staging_dir = build_index.build(index_type=ctx["index_type"], overrides=ctx["overrides"])
+    index_meta = json.loads((staging_dir / build_index.INDEX_META_FILENAME).read_text(encoding="utf-8"))
+    return {"records": index_meta["count"], "staging_dir": str(staging_dir), "index_version": index_meta["index_version"]}
+
+def build_is_valid(result):
+    # 아직 publish 전인 staging 디렉터리가 남아 있거나, 이미 그 버전이 배포(CURRENT)된 상태
+    return Path(result["staging_dir"]).exists() or publish_is_valid({"version": result["index_version"]})
+
+def publish_fingerprint(ctx):
+    return ctx["results"]["build"]["index_version"]
+
+def publish_execute(ctx):
+    from scripts import build_index
+    name = build_index.publish(Path(ctx["results"]["build"]["staging_dir"]))
+    return {"records": ctx["results"]["build"]["records"], "version": name}
+
+def publish_is_valid(result):
+    from scripts.build_index import current_version_dir
+    current = current_version_dir()
+    return current is not None and current.name == result["version"]
+
+STAGE_FUNCS = {
+    "fetch": (fetch_fingerprint, fetch_execute, None),
+    "structure": (structure_fingerprint, structure_execute, None),
+    "preprocess": (preprocess_fingerprint, preprocess_execute, None),
+    "embed": (embed_fingerprint, embed_execute, embed_is_valid),
+    "build": (build_fingerprint, build_execute, build_is_valid),
+    "publish": (publish_fingerprint, publish_execute, publish_is_valid),
+}
+
+
+def run(skip_fetch: bool = False, force: str = None, base_url: str = None, index_type: str = "flat",
+        overrides: dict = None, batch_size: int = None, workers: int = None) -> dict:
+    """파이프라인 1회 실행. 단계별 status(ran/skipped), 소요 시간, 처리 건수 요약을 반환"""
+    ctx = {
+        "base_url": base_url, "index_type": index_type, "overrides": overrides or {},
+        "batch_size": batch_size, "workers": workers, "results": {},
+    }
+    forced = set(STAGES[STAGES.index(force):]) if force else set()
+    report = {}
+    with pipeline_lock():
+        state = load_state()
+        started = time.perf_counter()
+        for name in STAGES:
+            fingerprint_fn, execute_fn, is_valid_fn = STAGE_FUNCS[name]
+            if name == "fetch" and skip_fetch:
+                report[name] = {"status": "skipped", "duration": 0.0, "records": None}
+                continue
+            prev = state["stages"].get(name)
+            inputs = fingerprint_fn(ctx)
+            if (name not in forced and prev and inputs is not None and prev["fingerprint"] == inputs
+                    and (is_valid_fn is None or is_valid_fn(prev["result"]))):
+                ctx["results"][name] = prev["result"]
+                report[name] = {"status": "skipped", "duration": 0.0, "records": prev["result"].get("records")}
+                logger.info(f"pipeline: {name} skipped (입력 변경 없음)")
+                continue
+
+            stage_started = time.perf_counter()
+            try:
+                result = execute_fn(ctx)
+            except Exception as e:
+                if name != "fetch":
+                    raise
+                # 수집 실패는 이전에 받은 raw 데이터로 계속 (다음 실행에서 체크포인트부터 이어받음)
+                logger.warning(f"pipeline: fetch 실패, 기존 데이터로 계속 진행 ({e})")
+                report[name] = {"status": "failed", "duration": round(time.perf_counter() - stage_started, 2),
+                                "records": None}
+                continue
+            duration = time.perf_counter() - stage_started
+            ctx["results"][name] = result
+            # 앞 단계가 다시 실행되면 다음 단계 fingerprint가 바뀌므로 자연스럽게 이어서 실행됨.
+            # preprocess는 입력 파일을 제자리에서 고치므로 실행 후 상태를 기록
+            state["stages"][name] = {
+                "fingerprint": fingerprint_fn(ctx) if name == "preprocess" else inputs,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "duration": round(duration, 2),
+                "result": result,
+            }
+            save_state(state)
+            report[name] = {"status": "ran", "duration": round(duration, 2), "records": result.get("records")}
+            logger.info(f"pipeline: {name} done in {duration:.1f}s ({result})")
+
+        state["last_run"] = {
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration": round(time.perf_counter() - started, 2),
+            "stages": report,
+        }
+        save_state(state)
+
+    print(f"{'stage':<12}{'status':<10}{'sec':>8}{'records':>10}")
+    for name, row in report.items():
+        records = "" if row["records"] is None else row["records"]
+        print(f"{name:<12}{row['status']:<10}{row['duration']:>8.1f}{records:>10}")
+    return report
+
+
+if __name__ == "__main__":
+    from scripts.build_index import INDEX_TYPES
+    parser = argparse.ArgumentParser(description="정책 데이터 파이프라인 (fetch → structure → preprocess → embed → build → publish)")
+    parser.add_argument("--skip-fetch", action="store_true", help="복지로 수집 단계 건너뜀")
+    parser.add_argument("--force", choices=STAGES, help="이 단계부터는 입력이 같아도 다시 실행")
+    parser.add_argument("--base-url", default=None, help="복지로 목록 API 주소 (fetch_policies --base-url)")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--batch-size", type=int, default=None, help="임베딩 배치 크기 (기본: embed_policies 기본값)")
+    parser.add_argument("--workers", type=int, default=None, help="임베딩 워커 프로세스 수")
+    args = parser.parse_args()
+    try:
+        run(skip_fetch=args.skip_fetch, force=args.force, base_url=args.base_url, index_type=args.index_type,
+            batch_size=args.batch_size, workers=args.workers)
+    except PipelineLocked as e:
+        raise SystemExit(str(e))
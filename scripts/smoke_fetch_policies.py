@@ -0,0 +1,70 @@
+# scripts/smoke_fetch_policies.py
+# fetch_policies.crawl()을 로컬 대체 서버(scripts/mock_bokjiro_server.py + scripts/fixtures/bokjiro)에 돌려서
+# 1) 일부 페이지 실패 시 나머지는 체크포인트에 남고 2) 다시 실행하면 남은 페이지만 이어받으며(503 재시도 포함)
+# 3) 내용이 같으면 파일을 다시 쓰지 않는지 확인한다. API 키/네트워크 불필요.
+#
+#   python -m scripts.smoke_fetch_policies
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from scripts import fetch_policies
+from scripts.mock_bokjiro_server import load_recordings, make_server
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "bokjiro"
+PER_PAGE = 2
+
+def crawl(base_url: str, retries: int) -> dict:
+    return asyncio.run(fetch_policies.crawl(base_url, "local", concurrency=2, rate=0, retries=retries,
+                                            per_page=PER_PAGE))
+
+def saved_records() -> list:
+    records = []
+    for path in sorted(fetch_policies.RAW_DIR.glob("*.json")):
+        records.extend(json.loads(path.read_text(encoding="utf-8"))["servList"])
+    return records
+
+def main():
+    items = load_recordings(FIXTURES_DIR)
+    total_pages = (len(items) + PER_PAGE - 1) // PER_PAGE
+    server = make_server(items, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/list"
+    fetch_policies.BACKOFF_BASE = 0.01
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)   # RAW_DIR / CHECKPOINT_FILE는 상대 경로
+
+        # 1) 마지막 페이지만 계속 503 → 실패로 끝나지만 나머지 페이지는 저장 + 체크포인트
+        server.fail_pages = {total_pages}
+        try:
+            crawl(base_url, retries=1)
+            raise AssertionError("실패한 페이지가 있는데 crawl이 성공함")
+        except RuntimeError as e:
+            print(f"1차 실행 실패 (예상대로): {e}")
+        checkpoint = json.loads(fetch_policies.CHECKPOINT_FILE.read_text(encoding="utf-8"))
+        assert checkpoint["completed"] == list(range(1, total_pages)), checkpoint["completed"]
+
+        # 2) 간헐적 503 속에서 재시도하며 남은 페이지만 이어받음
+        server.fail_pages = set()
+        server.fail_rate = 0.3
+        summary = crawl(base_url, retries=10)
+        print(f"2차 실행: {summary}")
+        assert summary["resumed"] == total_pages - 1 and summary["fetched"] == 1, summary
+        assert [r["servId"] for r in saved_records()] == [dict(item)["servId"] for item in items]
+
+        # 3) 변경 없음 → 전체를 다시 받지만 파일은 쓰지 않음
+        server.fail_rate = 0.0
+        summary = crawl(base_url, retries=0)
+        print(f"3차 실행: {summary}")
+        assert summary["fetched"] == total_pages and summary["written"] == 0, summary
+        assert summary["unchanged"] == total_pages, summary
+
+    server.shutdown()
+    print(f"OK: {len(items)} services / {total_pages} pages")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# scripts/structure_policies.py
+# fetch_policies가 받은 목록 페이지(raw_policies/central)를 정책 1건 = 파일 1개(structured_policies/central/{servId}.json)로 변환
+#
+# - 이미 있는 파일은 목록 API가 주는 필드만 갱신하고 benefit/target 등 따로 채운 내용은 유지
+# - 내용이 같으면 다시 쓰지 않음 (pipeline의 preprocess/embed fingerprint가 불필요하게 바뀌지 않도록)
+# - 목록에서 사라진 정책 파일은 지우지 않는다
+
+import json
+from pathlib import Path
+from scripts.fetch_policies import RAW_DIR
+
+STRUCTURED_DIR = Path("structured_policies/central")
+
+# 목록 응답 필드 → 구조화 필드 (값이 비어 있으면 기존 값 유지)
+LIST_FIELDS = {
+    "servId": "servId",
+    "servNm": "policy_name",
+    "servDtlLink": "url",
+    "jurMnofNm": "ministry",
+    "trgterIndvdlArray": "trgterIndvdlArray",
+    "lifeArray": "lifeArray",
+    "intrsThemaArray": "intrsThemaArray",
+}
+
+def load_raw_items() -> list:
+    items = {}
+    for path in sorted(RAW_DIR.glob("welfare_list_page_*.json")):
+        for item in json.loads(path.read_text(encoding="utf-8")).get("servList", []):
+            if item.get("servId"):
+                items[item["servId"]] = item
+    return list(items.values())
+
+def to_structured(item: dict, data: dict) -> dict:
+    data = dict(data)
+    for src, dst in LIST_FIELDS.items():
+        if item.get(src):
+            data[dst] = item[src]
+    # 상세 내용이 아직 없으면 목록의 요약으로 채운다
+    if not data.get("benefit"):
+        data["benefit"] = item.get("servDgst", "")
+    data.setdefault("target", "")
+    return data
+
+def run() -> dict:
+    STRUCTURED_DIR.mkdir(parents=True, exist_ok=True)
+    items = load_raw_items()
+    written = 0
+    for item in items:
+        path = STRUCTURED_DIR / f"{item['servId']}.json"
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        new = to_structured(item, data)
+        if new != data:
+            path.write_text(json.dumps(new, ensure_ascii=False, indent=2), encoding="utf-8")
+            written += 1
+    print(f"구조화 완료: {len(items)}건 중 {written}건 갱신")
+    return {"records": len(items), "written": written}
+
+if __name__ == "__main__":
+    run()
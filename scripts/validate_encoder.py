@@ -0,0 +1,79 @@
+# scripts/validate_encoder.py
+# 양자화/ONNX 인코더가 fp32 대비 랭킹 품질을 유지하는지 검증
+#  - 코사인 드리프트: 정책 문서를 후보 인코더로 다시 임베딩해 policy_embeddings.npy의 fp32 벡터와 비교
+#  - top-k 겹침: 쿼리 셋을 fp32 / 후보 인코더로 임베딩해 같은 정책 임베딩에서 검색한 top-k 비교
+#  - 지연: 쿼리 1건 인코딩 p50/p99
+import argparse
+import json
+import time
+import numpy as np
+from pathlib import Path
+from backend.encoder import ENCODER_BACKENDS, load_encoder
+from backend.query_expansion import query_expand
+from scripts.embed_policies import (
+    EMBEDDINGS_FILE, MANIFEST_FILE, build_text, load_policies,
+)
+
+DEFAULT_QUERIES = [
+    "배달 알바", "독거 노인", "임산부 지원", "장애인 일자리", "청년 월세 지원",
+    "프리랜서 소득 감소", "중장년 재취업", "저소득층 의료비", "1인가구 주거", "아동 돌봄",
+]
+
+def expand(query: str) -> str:
+    return query + " " + " ".join(query_expand(query))
+
+def encode_timed(encoder, texts, batch_size: int):
+    vecs, latencies = [], []
+    for i in range(0, len(texts), batch_size):
+        started = time.perf_counter()
+        vecs.append(encoder.encode(texts[i:i + batch_size]))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.concatenate(vecs), latencies
+
+def policy_sample(limit: int, seed: int):
+    """manifest 행 순서로 policy_embeddings.npy와 맞춘 (행 번호, 텍스트) 샘플"""
+    manifest = json.loads(Path(MANIFEST_FILE).read_text(encoding="utf-8"))
+    row_of = {key: row for row, (key, _) in enumerate(manifest["rows"])}
+    pairs = [(row_of[key], build_text(data)) for key, data in load_policies() if key in row_of]
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(pairs), size=min(limit, len(pairs)), replace=False)
+    return [pairs[i] for i in picked]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="인코더 백엔드 품질/지연 검증")
+    parser.add_argument("--backend", choices=ENCODER_BACKENDS, default="int8")
+    parser.add_argument("--onnx-path", default="data/kobert_encoder.onnx")
+    parser.add_argument("--queries", help="쿼리 파일 (한 줄에 하나)")
+    parser.add_argument("--docs", type=int, default=200, help="코사인 드리프트 측정용 정책 수")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    reference = load_encoder("torch")
+    candidate = load_encoder(args.backend, onnx_path=args.onnx_path)
+    embs = np.load(EMBEDDINGS_FILE)
+
+    # 1) 정책 문서 코사인 드리프트 (fp32 벡터는 이미 정규화되어 있으므로 내적 = 코사인)
+    sample = policy_sample(args.docs, seed=0)
+    rows = np.array([row for row, _ in sample])
+    doc_vecs, _ = encode_timed(candidate, [text for _, text in sample], args.batch_size)
+    cosine = np.sum(doc_vecs * embs[rows], axis=1)
+    print(f"[{args.backend}] 문서 {len(sample)}건 코사인: mean={cosine.mean():.5f} "
+          f"min={cosine.min():.5f} p1={np.percentile(cosine, 1):.5f}")
+
+    # 2) 쿼리 top-k 겹침 + 3) 쿼리 1건 인코딩 지연
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        queries = [q.strip() for q in Path(args.queries).read_text(encoding="utf-8").splitlines() if q.strip()]
+    texts = [expand(q) for q in queries]
+    ref_vecs, ref_lat = encode_timed(reference, texts, 1)
+    cand_vecs, cand_lat = encode_timed(candidate, texts, 1)
+    k = min(args.k, embs.shape[0])
+    ref_top = np.argsort(-(ref_vecs @ embs.T), axis=1)[:, :k]
+    cand_top = np.argsort(-(cand_vecs @ embs.T), axis=1)[:, :k]
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)]
+    query_cos = np.sum(ref_vecs * cand_vecs, axis=1)
+    print(f"[{args.backend}] 쿼리 {len(queries)}건 top-{k} 겹침: mean={np.mean(overlap):.3f} min={np.min(overlap):.3f}, "
+          f"쿼리 코사인 mean={query_cos.mean():.5f}")
+    print(f"지연(ms, 1건): torch p50={np.percentile(ref_lat, 50):.1f} p99={np.percentile(ref_lat, 99):.1f} | "
+          f"{args.backend} p50={np.percentile(cand_lat, 50):.1f} p99={np.percentile(cand_lat, 99):.1f}")